@@ -29,7 +29,7 @@ if 'data' not in st.session_state:
     # remove max value from data['totalUsePower']
 
     usePowerMax = data['totalUsePower'].max()
-    data['totalUsePower'] = data['totalUsePower'].apply(lambda x: x if x < usePowerMax else 0)
+    data['totalUsePower'] = data['totalUsePower'].where(data['totalUsePower'] < usePowerMax, 0)
 
     st.session_state.data = data
 else:
@@ -283,29 +283,19 @@ if viz == "EasyGreen Production Development":
     showSelfUse = st.sidebar.toggle('Show Utilized Production', True)    
     showNightUsage = st.sidebar.toggle('Show Night Usage', False, help = 'Night usage is calculated as the usage between 18:00 and 06:00')
     
-    data['usage_month'] = data['usage_date'].dt.month 
+    data['usage_month'] = data['usage_date'].dt.month
 
     # Ensure 'totalProductPower' is float and apply conditions
-    data['totalProductPower'] = data['totalProductPower'].astype(float)
-    data['totalProductPower'] = data['totalProductPower'].apply(lambda x: max(0, min(x, 10000)))
+    data['totalProductPower'] = data['totalProductPower'].astype(float).clip(0, 10000)
 
-    # Convert 'usage_date' to month names
-    data['usage_month'] = data['usage_date'].dt.strftime('%B')
     month_order = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
-    data['usage_month'] = pd.Categorical(data['usage_month'], categories=month_order, ordered=True)
 
-    # Ensure 'totalProductPower' is float and apply conditions
-    data['totalProductPower'] = data['totalProductPower'].astype(float)
-    data['totalProductPower'] = data['totalProductPower'].apply(lambda x: max(0, min(x, 10000)))
-
-    # Chart data
-    production_data = data.groupby('usage_month')['totalProductPower'].mean().reset_index()
-    self_use_data = data.groupby('usage_month')['totalSelfUsePower'].mean().reset_index()
-    totalUsePower_data = data.groupby('usage_month')['totalUsePower'].mean().reset_index()
-    night_data = data.groupby('usage_month')['night_usage'].mean().reset_index()
+    # Chart data: one aggregation over the integer months, named afterwards
+    monthly_data = data.groupby('usage_month')[['totalProductPower', 'totalSelfUsePower', 'totalUsePower', 'night_usage']].mean().reset_index()
+    monthly_data['usage_month'] = [month_order[m - 1] for m in monthly_data['usage_month']]
 
     # Charts
-    production_chart = alt.Chart(production_data).mark_bar(color = 'green', opacity=0.5).encode(
+    production_chart = alt.Chart(monthly_data).mark_bar(color = 'green', opacity=0.5).encode(
         x=alt.X('usage_month:N', title='Month', sort=month_order),  # Specify nominal data with :N
         y=alt.Y('totalProductPower:Q', title='Production in kWh'),  # Specify quantitative data with :Q
             tooltip=[
@@ -316,7 +306,7 @@ if viz == "EasyGreen Production Development":
         height=600
     )
 
-    selfUse_chart = alt.Chart(self_use_data).mark_bar(color = 'green').encode(
+    selfUse_chart = alt.Chart(monthly_data).mark_bar(color = 'green').encode(
             x=alt.X('usage_month:N', sort=month_order),  # Specify nominal data with :N
             y=alt.Y('totalSelfUsePower:Q'),  # Specify quantitative data with :Q
             tooltip=[
@@ -327,7 +317,7 @@ if viz == "EasyGreen Production Development":
             height=600
     )
 
-    use_chart = alt.Chart(totalUsePower_data).mark_bar(color = 'red', opacity=0.5).encode(
+    use_chart = alt.Chart(monthly_data).mark_bar(color = 'red', opacity=0.5).encode(
             x=alt.X('usage_month:N', sort=month_order, title = 'Month'),  # Specify nominal data with :N
             y=alt.Y('totalUsePower:Q', title= 'Usage in kWh'),
             tooltip=[
@@ -338,7 +328,7 @@ if viz == "EasyGreen Production Development":
             height=600
     )
 
-    nightUsage_chart = alt.Chart(night_data).mark_bar(color = 'red').encode(
+    nightUsage_chart = alt.Chart(monthly_data).mark_bar(color = 'red').encode(
             x=alt.X('usage_month:N', sort=month_order),
             y=alt.Y('night_usage:Q'),
             tooltip=[
@@ -0,0 +1,165 @@
+"""Load test of a running dashboard with simulated concurrent sessions.
+
+Run from the ``web`` directory against ``streamlit run app.py`` or
+``serve.py``::
+
+    python -m benchmarks.loadtest --url http://localhost:8501 --sessions 20 --duration 60
+
+Every session opens the page the way a browser does: it loads the page, then
+connects to Streamlit's websocket with the cookies it got. Then it keeps
+acting until ``--duration`` runs out. An action switches to another page or,
+on the map page, moves the production range slider. After each action the
+session waits ``--think`` seconds on average. The latency of a rerun runs
+from sending the new widget state to the end of the script run. The report
+gives the reruns per second over all sessions and the p50, p95 and max
+latency of each kind of action.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+PAGE_WIDGET = 'Select page'
+SLIDER_PAGE = 'EasyGreen Geospatial Data'
+SLIDER_WIDGET = 'Filter map by daily production range'
+XSRF_COOKIE = '_streamlit_xsrf'
+
+
+def _cookies(url):
+    # what the browser gets with the page: the balancer's and Streamlit's cookies
+    with urllib.request.urlopen(url, timeout=30) as response:
+        pairs = [c.split(';', 1)[0] for c in response.headers.get_all('Set-Cookie') or []]
+    return dict(p.split('=', 1) for p in pairs if '=' in p)
+
+
+class Session:
+    """One simulated browser session and the timings of its reruns."""
+
+    def __init__(self, url, rng):
+        self.url = url.rstrip('/')
+        self.rng = rng
+        self.widgets = {}
+        self.states = {}
+        self.page = None
+        self.timings = []
+        self.errors = 0
+
+    async def rerun(self, websocket, action):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ''
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await websocket.send(msg.SerializeToString())
+        failed = False
+        while True:
+            reply = ForwardMsg()
+            reply.ParseFromString(await websocket.recv())
+            kind = reply.WhichOneof('type')
+            if kind == 'delta' and reply.delta.WhichOneof('type') == 'new_element':
+                element = reply.delta.new_element
+                failed |= element.WhichOneof('type') == 'exception'
+                if element.WhichOneof('type') in ('selectbox', 'slider'):
+                    widget = getattr(element, element.WhichOneof('type'))
+                    self.widgets[widget.label] = widget
+            elif kind == 'script_finished' and reply.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.timings.append((action, time.perf_counter() - start))
+        self.errors += failed
+
+    def switch_page(self):
+        widget = self.widgets[PAGE_WIDGET]
+        self.page = self.rng.choice([p for p in widget.options if p != self.page])
+        # widgets of the old page are gone
+        self.states = {}
+        state = self.states.setdefault(widget.id, WidgetState(id=widget.id))
+        state.string_value = self.page
+        return 'page'
+
+    def move_slider(self):
+        widget = self.widgets[SLIDER_WIDGET]
+        low, high = sorted(self.rng.uniform(widget.min, widget.max) for _ in range(2))
+        state = self.states.setdefault(widget.id, WidgetState(id=widget.id))
+        state.double_array_value.data[:] = [round(low), round(high)]
+        return 'slider'
+
+    async def run(self, deadline, think):
+        cookies = await asyncio.to_thread(_cookies, self.url + '/')
+        host = self.url.split('://', 1)[1]
+        scheme = 'wss' if self.url.startswith('https') else 'ws'
+        protocols = ['streamlit', cookies[XSRF_COOKIE]] if XSRF_COOKIE in cookies else ['streamlit']
+        async with connect(f'{scheme}://{host}/_stcore/stream', subprotocols=protocols, origin=self.url,
+                           additional_headers={'Cookie': '; '.join(f'{k}={v}' for k, v in cookies.items())},
+                           max_size=None) as websocket:
+            await self.rerun(websocket, 'open')
+            self.page = self.widgets[PAGE_WIDGET].options[0]
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.rng.expovariate(1 / think) if think else 0)
+                on_map = self.page == SLIDER_PAGE and SLIDER_WIDGET in self.widgets
+                action = self.move_slider() if on_map and self.rng.random() < 0.5 else self.switch_page()
+                await self.rerun(websocket, action)
+
+
+def _summary(latencies):
+    seconds = np.array(latencies)
+    return {'reruns': len(seconds), 'p50': round(float(np.percentile(seconds, 50)), 4),
+            'p95': round(float(np.percentile(seconds, 95)), 4), 'max': round(float(seconds.max()), 4)}
+
+
+async def load_test(url, sessions, duration, think, seed=0):
+    """Run ``sessions`` concurrent sessions for ``duration`` seconds and summarize their reruns."""
+    deadline = time.monotonic() + duration
+    clients = [Session(url, random.Random(seed + i)) for i in range(sessions)]
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(c.run(deadline, think) for c in clients), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    timings = [t for c in clients for t in c.timings]
+    actions = sorted({a for a, _ in timings})
+    result = {'url': url, 'sessions': sessions, 'seconds': round(elapsed, 2),
+              'failed_sessions': sum(isinstance(o, Exception) for o in outcomes),
+              'errors': sum(c.errors for c in clients),
+              'throughput': round(len(timings) / elapsed, 2)}
+    if timings:
+        result['all'] = _summary([s for _, s in timings])
+        result.update({a: _summary([s for b, s in timings if b == a]) for a in actions})
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            result.setdefault('first_failure', repr(outcome))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8501', help="address of the dashboard")
+    parser.add_argument('--sessions', type=int, default=10, help="concurrent sessions")
+    parser.add_argument('--duration', type=float, default=60, help="seconds to keep the sessions busy")
+    parser.add_argument('--think', type=float, default=0.5, help="mean seconds between a session's actions")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="print the result as one JSON line")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(load_test(args.url, args.sessions, args.duration, args.think, args.seed))
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"{result['sessions']} sessions for {result['seconds']}s against {result['url']}: "
+          f"{result['throughput']} reruns/s, {result['errors']} failed reruns, "
+          f"{result['failed_sessions']} failed sessions")
+    for key in ('all', 'open', 'page', 'slider'):
+        if key in result:
+            r = result[key]
+            print(f"  {key:7} {r['reruns']:6} reruns  p50 {r['p50'] * 1000:8.1f} ms  "
+                  f"p95 {r['p95'] * 1000:8.1f} ms  max {r['max'] * 1000:8.1f} ms")
+    if 'first_failure' in result:
+        print(f"  first failure: {result['first_failure']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Time the data pipeline and the page renders on one data directory.
+
+Meant to be started by :mod:`benchmarks.run` in a fresh process, with
+``SOLARDATA_DATA_DIR`` and ``SOLARDATA_STORE_DIR`` pointing at the data to
+measure. Prints one JSON object with the seconds each stage took, the bytes of
+the charts of each page and the number of rows.
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from solardata import aggregates, filters, hexbin, rollup, store, timeseries
+
+WEB_DIR = Path(__file__).resolve().parents[1]
+PAGES = ["Solar Energy Data in Denmark", "EasyGreen Geospatial Data", "EasyGreen Production Development"]
+
+
+def timed(function, repeat=1):
+    """Median wall time of ``repeat`` calls and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def pipeline_stages(repeat):
+    """Loading, filtering and aggregation steps behind the three data pages."""
+    results = {}
+    # cold builds of the store and the derived tables, as after a new data export
+    results['load/household store'], data = timed(store.build_household_store)
+    results['load/user stats'], _ = timed(aggregates.build_user_stats)
+    results['load/monthly rollup'], _ = timed(rollup.ensure_rollup)
+    results['load/time series'], _ = timed(timeseries.update_timeseries)
+    results['rows'] = len(data)
+    del data
+
+    results['read/household'], _ = timed(store.load_household, repeat)
+    results['read/user summary'], summary = timed(aggregates.load_user_summary, repeat)
+    results['read/monthly rollup'], cube = timed(rollup.load_rollup, repeat)
+    results['read/time series'], series = timed(timeseries.load_timeseries, repeat)
+
+    weekly = series['weekly']
+    start, end = weekly['Date'].quantile(0.25), weekly['Date'].quantile(0.75)
+    results['filter/time series'], _ = timed(
+        lambda: weekly[(weekly['Date'] >= start) & (weekly['Date'] <= end)], repeat)
+    summary = summary.dropna(subset=['latitude', 'longitude', 'totalProductPower', 'totalSelfUsePower', 'age'])
+    date_range = pd.to_datetime([summary['usage_date'].min(), summary['usage_date'].median()])
+    results['filter/map'], mask = timed(lambda: filters.household_mask(
+        summary, date_range=date_range, age_groups=filters.AGE_GROUPS[1:3]), repeat)
+    results['aggregate/hexagons'], _ = timed(
+        lambda: hexbin.hex_cells(summary[mask], 'totalSelfUsePower', [0, 3000]), repeat)
+    results['aggregate/monthly means'], _ = timed(
+        lambda: rollup.rollup_means(cube, age_groups=filters.AGE_GROUPS[:2]), repeat)
+    return results
+
+
+def page_renders(repeat, timeout):
+    """Headless renders of every data page through Streamlit's AppTest.
+
+    The first render of a page loads its data into the shared cache; warm
+    renders only filter, aggregate and build the chart specs. The bytes of the
+    chart specs sent to the browser are recorded too.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    results = {}
+    app = AppTest.from_file(str(WEB_DIR / 'app.py'), default_timeout=timeout)
+    app.run()
+    for page in PAGES:
+        results[f'render/{page}/cold'], _ = timed(lambda: app.sidebar.selectbox[0].select(page).run())
+        if app.exception:
+            raise RuntimeError(f"{page}: {app.exception[0].message}")
+        results[f'render/{page}/warm'], _ = timed(app.run, repeat)
+        charts = app.get('vega_lite_chart') + app.get('deck_gl_json_chart')
+        results[f'payload/{page}'] = sum(len(chart.proto.SerializeToString()) for chart in charts)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="runs of each warm stage, the median is kept")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds one page render may take")
+    args = parser.parse_args(argv)
+    results = pipeline_stages(args.repeat)
+    results.update(page_renders(args.repeat, args.timeout))
+    print(json.dumps(results))
+
+
+if __name__ == '__main__':
+    main()
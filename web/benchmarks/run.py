@@ -0,0 +1,113 @@
+"""Benchmark the dashboard on synthetic data of several sizes.
+
+Run from the ``web`` directory::
+
+    python -m benchmarks.run --sizes 1000 100000 1000000
+
+For every size a synthetic data directory is generated once under
+``benchmarks/data``, and :mod:`benchmarks.measure` times it in a fresh
+process against an empty store. Results are appended to
+``benchmarks/results.jsonl`` together with the current commit. Each stage is
+then compared with the latest run of an earlier commit, and stages that got
+slower by more than ``--threshold`` are flagged.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from . import synthetic
+
+BENCH_DIR = Path(__file__).resolve().parent
+WEB_DIR = BENCH_DIR.parent
+SIZES = [1_000, 100_000, 1_000_000]
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=WEB_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def measure(size, repeat, timeout, seed=0):
+    """Timings of one data size, measured in a subprocess with its own data and store."""
+    data_dir = BENCH_DIR / 'data' / str(size)
+    if not (data_dir / 'dfMerged.csv').exists():
+        print(f"generating {size} user-days -> {data_dir}")
+        synthetic.generate(data_dir, size, seed)
+    store_dir = data_dir / 'store'
+    shutil.rmtree(store_dir, ignore_errors=True)
+
+    env = dict(os.environ, SOLARDATA_DATA_DIR=str(data_dir), SOLARDATA_STORE_DIR=str(store_dir))
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.measure', '--repeat', str(repeat),
+                             '--timeout', str(timeout)],
+                            cwd=WEB_DIR, env=env, capture_output=True, text=True)
+    if output.returncode:
+        raise RuntimeError(f"benchmark of {size} user-days failed:\n{output.stderr}")
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def compare(results, history, threshold):
+    """Latest timings next to those of the latest earlier commit, per size and stage."""
+    results = pd.DataFrame(results)
+    earlier = history[history['commit'] != results['commit'].iloc[0]]
+    if earlier.empty:
+        return None
+    baseline = earlier.sort_values('time').groupby(['size', 'stage']).last()
+    table = results.set_index(['size', 'stage'])[['value']].join(
+        baseline[['value', 'commit']].rename(columns={'value': 'before'}), how='inner')
+    table['change'] = table['value'] / table['before'] - 1
+    timing = ~table.index.get_level_values('stage').str.startswith(('rows', 'payload/'))
+    table['regression'] = timing & (table['change'] > threshold)
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="user-days of synthetic data")
+    parser.add_argument('--repeat', type=int, default=3, help="runs of each warm stage, the median is kept")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds one page render may take")
+    parser.add_argument('--threshold', type=float, default=0.2, help="slowdown flagged as a regression")
+    parser.add_argument('--results', type=Path, default=BENCH_DIR / 'results.jsonl')
+    parser.add_argument('--check', action='store_true', help="exit with status 1 if a stage regressed")
+    args = parser.parse_args(argv)
+
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    if _git('status', '--porcelain', '--untracked-files=no', '--', '.'):
+        commit += '+dirty'
+    run = {'commit': commit, 'time': datetime.datetime.now().isoformat(timespec='seconds'),
+           'python': platform.python_version(), 'pandas': pd.__version__}
+
+    results = []
+    for size in args.sizes:
+        timings = measure(size, args.repeat, args.timeout)
+        results += [{**run, 'size': size, 'stage': stage, 'value': value} for stage, value in timings.items()]
+    with open(args.results, 'a') as f:
+        for record in results:
+            f.write(json.dumps(record) + '\n')
+
+    table = pd.DataFrame(results).pivot(index='stage', columns='size', values='value')
+    print(table.to_string(float_format='{:.3f}'.format))
+    history = pd.read_json(args.results, lines=True, dtype={'commit': str})
+    changes = compare(results, history, args.threshold)
+    if changes is None:
+        print(f"no earlier commit in {args.results} to compare with")
+        return
+    regressions = changes[changes['regression']]
+    print(f"\n{len(regressions)} stages more than {args.threshold:.0%} slower than before:")
+    if len(regressions):
+        print(regressions.to_string(float_format='{:.3f}'.format))
+    if args.check and len(regressions):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
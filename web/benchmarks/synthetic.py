@@ -0,0 +1,110 @@
+"""Synthetic stand-ins for the data files that are not in the repository.
+
+``dfMerged.csv``, ``user_id-age.csv`` and ``energinetForecast.csv`` are written
+with the columns and formats of the real exports: daily household rows with a
+seasonal production curve, birth dates as ``dd/mm/yyyy`` (some missing),
+and an hourly solar forecast with decimal commas. Google Trends and gas
+prices are small and public, so they are copied from ``final/data``.
+"""
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_DATA = Path(__file__).resolve().parents[2] / 'final' / 'data'
+FIRST_DAY = pd.Timestamp('2022-06-01')
+LAST_DAY = pd.Timestamp('2024-04-20')
+
+
+def _season(days):
+    # 0 in winter, 1 at midsummer
+    return np.clip(np.sin((days.dayofyear.to_numpy() - 80) / 365 * 2 * np.pi), 0.05, None)
+
+
+def household_rows(user_days, rng):
+    """``user_days`` daily rows, users joining on random days and reporting until ``LAST_DAY``."""
+    span = (LAST_DAY - FIRST_DAY).days + 1
+    starts = rng.integers(0, span, 2 * int(np.ceil(user_days / (span / 2))) + 1)
+    # enough users to reach user_days; the last one reports from its start until the total is reached
+    users = int(np.searchsorted(np.cumsum(span - starts), user_days)) + 1
+    starts = starts[:users]
+    lengths = span - starts
+    lengths[-1] -= lengths.sum() - user_days
+    user = np.repeat(np.arange(users), lengths)
+    day = np.repeat(starts, lengths) + (np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths))
+    n = len(user)
+
+    dates = FIRST_DAY + pd.to_timedelta(day, unit='D')
+    capacity = rng.gamma(4, 2.5, users)[user]
+    production = capacity * _season(dates) * rng.uniform(0.1, 1.2, n)
+    use = rng.gamma(3, 4, n)
+    self_use = np.minimum(production, use) * rng.uniform(0.3, 1, n)
+    # about one in twenty customers could not be geocoded
+    geocoded = rng.random(users) > 0.05
+    latitude = np.where(geocoded, rng.uniform(54.8, 57.6, users), np.nan)[user]
+    longitude = np.where(geocoded, rng.uniform(8.2, 12.6, users), np.nan)[user]
+    data = pd.DataFrame({
+        'user_id': 1000 + user,
+        'usage_date': dates.strftime('%Y-%m-%d'),
+        'totalBuyPower': use - self_use,
+        'totalProductPower': production,
+        'totalUsePower': use,
+        'totalOnGridPower': production - self_use,
+        'night_usage': use * rng.uniform(0.2, 0.5, n),
+        'totalSelfUsePower': self_use,
+        'latitude': latitude,
+        'longitude': longitude,
+        'age': np.nan,
+    })
+    # a few meter glitches for the outlier filter
+    glitches = rng.choice(n, max(1, n // 5000), replace=False)
+    data.loc[glitches, 'totalUsePower'] = 900.0
+    return data
+
+
+def ages(user_ids, rng):
+    """Birth dates in the format of ``user_id-age.csv``, a tenth of them missing."""
+    birth = pd.Timestamp('1935-01-01') + pd.to_timedelta(rng.integers(0, 365 * 70, len(user_ids)), unit='D')
+    birth = pd.Series(birth.strftime('%-d/%-m/%Y'))
+    birth[rng.random(len(user_ids)) < 0.1] = ''
+    return pd.DataFrame({'Kunde ID': user_ids, 'Fødselsdato': birth})
+
+
+def energinet(rng, start='2020-01-01', end='2024-04-28'):
+    """Hourly solar forecast for DK1 and DK2, growing over time like the installed capacity."""
+    hours = pd.date_range(start, end, freq='h')
+    daylight = np.clip(np.sin((hours.hour.to_numpy() - 6) / 12 * np.pi), 0, None)
+    growth = 1 + 2 * np.arange(len(hours)) / len(hours)
+    frames = []
+    for area, scale in (('DK1', 400), ('DK2', 250)):
+        forecast = daylight * _season(hours) * growth * scale * rng.uniform(0.6, 1, len(hours))
+        frames.append(pd.DataFrame({
+            'HourUTC': (hours - pd.Timedelta(hours=1)).strftime('%Y-%m-%d %H:%M'),
+            'HourDK': hours.strftime('%Y-%m-%d %H:%M'),
+            'PriceArea': area,
+            'ForecastType': 'Solar',
+            'ForecastCurrent': np.char.replace(np.round(forecast, 3).astype(str), '.', ','),
+        }))
+    return pd.concat(frames).sort_values(['HourDK', 'PriceArea'])
+
+
+def generate(data_dir, user_days, seed=0):
+    """Write a complete synthetic data directory with about ``user_days`` household rows.
+
+    ``data_dir`` must not be the repository's ``final/data``; point
+    ``SOLARDATA_DATA_DIR`` at the generated directory instead.
+    """
+    data_dir = Path(data_dir)
+    if data_dir.resolve() == REPO_DATA.resolve():
+        raise ValueError(f"{data_dir} holds the real data files, generate synthetic data elsewhere "
+                         "(e.g. under benchmarks/data) and set SOLARDATA_DATA_DIR")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    data = household_rows(user_days, rng)
+    data.to_csv(data_dir / 'dfMerged.csv', index=False)
+    ages(np.unique(data['user_id']), rng).to_csv(data_dir / 'user_id-age.csv', sep=';', index=False)
+    energinet(rng).to_csv(data_dir / 'energinetForecast.csv', sep=';', index=False)
+    for name in ('multiTimeline.csv', 'gasPrices.csv'):
+        shutil.copy(REPO_DATA / name, data_dir / name)
+    return len(data)
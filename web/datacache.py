@@ -0,0 +1,111 @@
+"""Process-wide data cache shared by all dashboard sessions.
+
+Frames returned from here are shared between sessions and must be treated as
+read-only; pages that add columns work on a ``.copy()``. Under ``serve.py``
+they are memory-mapped from the files in ``shared.SHARED_DIR``, which all
+worker processes share, instead of being read from the store.
+"""
+import logging
+
+import streamlit as st
+
+from solardata import aggregates, instrument, metrics, rollup, schema, shared, spatial, store, timeseries
+
+logger = logging.getLogger(__name__)
+
+# bytes held by each cached frame, keyed by (name, columns)
+footprints = {}
+_current = {}
+
+LOADERS = {
+    'user_summary': lambda columns: aggregates.load_user_summary(),
+    'rollup': lambda columns: rollup.load_rollup(),
+    'metrics': lambda columns: metrics.load_metrics(),
+    'timeseries': lambda columns: timeseries.load_timeseries(),
+}
+
+
+def _stamp(files):
+    # mtime and size identify a version of the source files
+    return tuple((p.stat().st_mtime_ns, p.stat().st_size) if p.exists() else None for p in files)
+
+
+def _nbytes(data):
+    if isinstance(data, dict):
+        return sum(_nbytes(v) for v in data.values())
+    return int(data.memory_usage(deep=True).sum())
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load(name, columns, stamp):
+    with instrument.stage(f'load {name}') as s:
+        if shared.SHARED_DIR:
+            data = shared.load(name, list(columns) if columns else None)
+        else:
+            data = LOADERS[name](list(columns) if columns else None)
+        s.rows_out = sum(map(len, data.values())) if isinstance(data, dict) else len(data)
+    footprints[name, columns] = _nbytes(data)
+    logger.info("cached %s %s: %.1f MB", name, ','.join(columns or ()), footprints[name, columns] / 2**20)
+    if logger.isEnabledFor(logging.DEBUG):
+        for key, frame in (data.items() if isinstance(data, dict) else [(name, data)]):
+            logger.debug("memory use of %s:\n%s", key, schema.memory_report(frame))
+    return data
+
+
+def _shared(name, stamp, columns=None):
+    if _current.setdefault(name, stamp) != stamp:
+        # the data changed: drop every old copy instead of waiting for eviction
+        _load.clear()
+        footprints.clear()
+        _current.clear()
+        _current[name] = stamp
+    with instrument.stage(f'cache {name}'):
+        return _load(name, tuple(columns) if columns else None, stamp)
+
+
+def _household_stamp():
+    if shared.SHARED_DIR:
+        # serve.py keeps the store up to date and re-exports it
+        return shared.stamp()
+    return _stamp([*store.source_files(), store.ensure_household_store(), store.ensure_users_store(),
+                   aggregates.ensure_user_stats(), rollup.ensure_rollup(), metrics.ensure_metrics()])
+
+
+def user_summary():
+    """Shared per-user summary used by the map page."""
+    return _shared('user_summary', _household_stamp())
+
+
+def monthly_rollup():
+    """Shared monthly rollup cube used by the production page."""
+    return _shared('rollup', _household_stamp())
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _spatial_index(stamp):
+    data = user_summary()
+    with instrument.stage('build spatial index', rows_in=len(data)):
+        return spatial.GridIndex(data['longitude'], data['latitude'])
+
+
+def spatial_index():
+    """Shared grid index over the coordinates of :func:`user_summary`, row for row."""
+    return _spatial_index(_household_stamp())
+
+
+def household_metrics():
+    """Shared per-household sums and derived metrics."""
+    return _shared('metrics', _household_stamp())
+
+
+def timeseries_data():
+    """Shared weekly production and daily search index / gas price series."""
+    if shared.SHARED_DIR:
+        return _shared('timeseries', shared.stamp())
+    manifest = timeseries.update_timeseries() / timeseries.MANIFEST
+    return _shared('timeseries', _stamp([*timeseries.source_files(), manifest]))
+
+
+def memory_footprint():
+    """Total bytes held by the cached frames."""
+    return sum(footprints.values())
@@ -0,0 +1,160 @@
+"""Serve the dashboard from several worker processes behind one port.
+
+Run from the ``web`` directory::
+
+    python serve.py --workers 4 --port 8501
+
+A single Streamlit process runs every session's rerun under one GIL. This
+script starts ``--workers`` Streamlit processes on ports from
+``--worker-port`` up, and balances the clients over them with a small TCP
+proxy on ``--port``. A browser keeps one websocket per session, so the proxy
+routes by connection. The worker is picked round-robin and stored in a
+cookie, so a reloaded page or a reconnecting session comes back to the
+worker that holds its state. All workers get the same cookie secret.
+
+Before the workers start, the store is brought up to date and every shared
+frame is exported to ``--shared-dir`` (see :mod:`solardata.shared`). The
+workers memory-map that one copy instead of each loading their own. After a
+new data export, ``python serve.py --export-only`` refreshes the files; the
+running workers notice the new version and remap it.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import re
+import secrets
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+WEB_DIR = Path(__file__).resolve().parent
+COOKIE = 'solardata_worker'
+_COOKIE_VALUE = re.compile(rb'(?im)^cookie:.*\b' + COOKIE.encode() + rb'=(\d+)')
+
+
+def export(shared_dir):
+    """Bring the store up to date and export the shared frames to ``shared_dir``."""
+    import datacache
+    from solardata import aggregates, metrics, rollup, shared, store, timeseries
+
+    store.ensure_household_store()
+    store.ensure_users_store()
+    aggregates.ensure_user_stats()
+    rollup.ensure_rollup()
+    metrics.ensure_metrics()
+    timeseries.update_timeseries()
+    return shared.export(datacache.LOADERS, shared_dir)
+
+
+def start_workers(count, first_port, shared_dir):
+    env = {**os.environ, 'SOLARDATA_SHARED_DIR': str(shared_dir)}
+    env.setdefault('STREAMLIT_SERVER_COOKIE_SECRET', secrets.token_hex(16))
+    workers = []
+    for port in range(first_port, first_port + count):
+        workers.append(subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', 'app.py',
+             '--server.port', str(port), '--server.address', '127.0.0.1', '--server.headless', 'true',
+             '--browser.gatherUsageStats', 'false'],
+            cwd=WEB_DIR, env=env))
+    return workers
+
+
+def wait_until_healthy(workers, ports, timeout=60):
+    deadline = time.monotonic() + timeout
+    for worker, port in zip(workers, ports):
+        while True:
+            if worker.poll() is not None:
+                raise RuntimeError(f"worker on port {port} exited with code {worker.returncode}")
+            try:
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/_stcore/health', timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"worker on port {port} did not come up within {timeout}s")
+                time.sleep(0.2)
+
+
+async def _pipe(reader, writer, set_cookie=None):
+    try:
+        if set_cookie:
+            # pin a new client to this worker with the first response
+            status, _, rest = (await reader.readuntil(b'\r\n\r\n')).partition(b'\r\n')
+            writer.write(status + b'\r\n' + set_cookie + rest)
+        while data := await reader.read(2**16):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        writer.close()
+
+
+def balancer(ports):
+    """Connection handler for :func:`asyncio.start_server` spreading clients over ``ports``."""
+    turn = itertools.count()
+
+    async def handle(reader, writer):
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            writer.close()
+            return
+        match = _COOKIE_VALUE.search(head)
+        worker = int(match[1]) if match and int(match[1]) < len(ports) else None
+        set_cookie = None
+        if worker is None:
+            worker = next(turn) % len(ports)
+            set_cookie = f'Set-Cookie: {COOKIE}={worker}; Path=/; SameSite=Lax\r\n'.encode()
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection('127.0.0.1', ports[worker])
+        except OSError:
+            writer.close()
+            return
+        upstream_writer.write(head)
+        await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer, set_cookie))
+
+    return handle
+
+
+async def serve(address, port, ports):
+    server = await asyncio.start_server(balancer(ports), address, port)
+    print(f"dashboard on http://{address}:{port}/ ({len(ports)} workers)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    from solardata import paths, shared
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of Streamlit processes")
+    parser.add_argument('--address', default='0.0.0.0', help="address the balancer listens on")
+    parser.add_argument('--port', type=int, default=8501, help="port the balancer listens on")
+    parser.add_argument('--worker-port', type=int, default=8601, help="port of the first worker")
+    parser.add_argument('--shared-dir', type=Path, default=shared.SHARED_DIR or paths.STORE_DIR / 'shared',
+                        help="directory of the shared Arrow files, e.g. under /dev/shm")
+    parser.add_argument('--export-only', action='store_true', help="only refresh the shared files")
+    args = parser.parse_args(argv)
+
+    print(f"exported shared frames -> {export(args.shared_dir)}", flush=True)
+    if args.export_only:
+        return
+    ports = list(range(args.worker_port, args.worker_port + args.workers))
+    workers = start_workers(args.workers, args.worker_port, args.shared_dir)
+    try:
+        wait_until_healthy(workers, ports)
+        asyncio.run(serve(args.address, args.port, ports))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+
+if __name__ == '__main__':
+    main()
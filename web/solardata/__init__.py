@@ -0,0 +1 @@
+"""Data pipeline for the Solar Energy Project dashboard and notebooks."""
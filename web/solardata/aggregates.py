@@ -0,0 +1,57 @@
+"""Per-user summary of the household table.
+
+The map page only needs one row per customer: the first day with data and the
+mean production, self-use and location. Those are stored as sums and counts
+per user, computed in one pass over the household store whenever it changes.
+Age and age group come from the users table when the summary is loaded.
+"""
+import pandas as pd
+
+from . import paths, schema, store
+
+MEAN_COLUMNS = ['totalProductPower', 'totalSelfUsePower', 'latitude', 'longitude']
+STATS_COLUMNS = ['user_id', 'usage_date', *MEAN_COLUMNS]
+
+
+def user_stats(data):
+    """Sums and non-null counts of the mean columns per user, plus the first day."""
+    values = data[MEAN_COLUMNS].astype('float64')
+    counts = values.notna()
+    # the loaded user_id is categorical; the per-user tables keep plain ids
+    grouped = pd.concat([values.add_suffix('_sum'), counts.add_suffix('_count'),
+                         data['user_id'].astype('int32'), data['usage_date']], axis=1).groupby('user_id')
+    stats = grouped.agg({'usage_date': 'min',
+                         **{f'{c}_sum': 'sum' for c in MEAN_COLUMNS},
+                         **{f'{c}_count': 'sum' for c in MEAN_COLUMNS}})
+    return stats.reset_index()
+
+
+def user_summary(stats):
+    """One row per user with the first ``usage_date`` and the mean of each column."""
+    summary = stats[['user_id', 'usage_date']].copy()
+    for c in MEAN_COLUMNS:
+        summary[c] = stats[f'{c}_sum'] / stats[f'{c}_count'].where(stats[f'{c}_count'] > 0)
+    return summary
+
+
+@store.locked
+def build_user_stats(store_path=None):
+    """Compute the per-user statistics from the household store and write them."""
+    store_path = store_path or paths.USER_STATS_STORE
+    stats = user_stats(store.load_household(STATS_COLUMNS))
+    store.write_parquet(stats, store_path)
+    return stats
+
+
+def ensure_user_stats(store_path=None):
+    """(Re)build the per-user statistics if the household store changed."""
+    store_path = store_path or paths.USER_STATS_STORE
+    sources = [store.ensure_household_store()]
+    store.build_once(lambda: store.is_stale(store_path, sources), lambda: build_user_stats(store_path))
+    return store_path
+
+
+def load_user_summary(store_path=None):
+    """Per-user summary read from the stored statistics, with each user's age and age group."""
+    summary = schema.compact(user_summary(pd.read_parquet(ensure_user_stats(store_path))))
+    return store.join_users(summary)
@@ -0,0 +1,92 @@
+"""Time alignment of series sampled at different frequencies.
+
+The hourly Energinet forecast, the weekly Google Trends index and the monthly
+gas prices each have their own date format (``DATE_FORMATS``). Series are not
+reindexed onto a daily calendar. :func:`align` evaluates each one only at the
+timestamps that are plotted, either linearly interpolated in time or as the
+last known value like a backward ``merge_asof``. An overlay of several series
+then costs as much as the points it draws.
+"""
+import numpy as np
+import pandas as pd
+
+# frequency -> format of the date column in the source files
+DATE_FORMATS = {
+    'hour': 'ISO8601',  # HourDK of energinetForecast.csv, e.g. 2020-01-01 00:00
+    'week': '%Y-%m-%d',  # Uge of multiTimeline.csv
+    'month': '%YM%m',  # month of gasPrices.csv, e.g. 2019M01
+}
+
+
+def parse_dates(values, frequency):
+    """Timestamps of a source date column sampled at ``frequency``, a ``DATE_FORMATS`` key."""
+    return pd.to_datetime(values, format=DATE_FORMATS[frequency])
+
+
+def _ns(times):
+    return np.asarray(times, dtype='datetime64[ns]').astype('int64')
+
+
+def _observed(times, values):
+    x, y = _ns(times), np.asarray(values, dtype='float64')
+    known = ~np.isnan(y)
+    return x[known], y[known]
+
+
+def interpolate_at(at, times, values):
+    """``values`` observed at the sorted ``times``, interpolated linearly at ``at``.
+
+    Before the first observation the result is NaN. After the last one that
+    value is held, as ``Series.interpolate`` does.
+    """
+    x, y = _observed(times, values)
+    if not len(x):
+        return np.full(len(at), np.nan)
+    return np.interp(_ns(at), x, y, left=np.nan, right=y[-1])
+
+
+def asof_at(at, times, values):
+    """The last of ``values`` observed at or before each of ``at``, as a backward ``merge_asof``."""
+    x, y = _observed(times, values)
+    position = np.searchsorted(x, _ns(at), 'right') - 1
+    return np.where(position >= 0, y[position.clip(0)] if len(y) else np.nan, np.nan)
+
+
+METHODS = {'interpolate': interpolate_at, 'asof': asof_at}
+
+
+def align(at, series, method='interpolate', column='Date'):
+    """Frame of the times ``at`` with every series of ``series`` evaluated at them.
+
+    ``series`` maps column names to ``(times, values)`` pairs with sorted
+    ``times``. ``method`` is a ``METHODS`` key, or a dict of them by column.
+    """
+    at = pd.DatetimeIndex(at)
+    columns = {column: at}
+    for name, (times, values) in series.items():
+        how = method[name] if isinstance(method, dict) else method
+        columns[name] = METHODS[how](at, times, values)
+    return pd.DataFrame(columns)
+
+
+def window(data, start, end, column='Date'):
+    """Rows of ``data`` (sorted by ``column``) from ``start`` to ``end``, with rows added at both edges.
+
+    The other columns are interpolated at ``start`` and ``end`` where those
+    fall between rows. The lines of a chart then run to the edges of the
+    selected range. Only the rows in the window are touched.
+    """
+    dates = data[column].to_numpy()
+    start, end = np.datetime64(pd.Timestamp(start), 'ns'), np.datetime64(pd.Timestamp(end), 'ns')
+    inside = data.iloc[dates.searchsorted(start, 'left'):dates.searchsorted(end, 'right')]
+    if not len(dates):
+        return inside
+    shown = inside[column].to_numpy()
+    edges = [t for t in (start, end) if dates[0] <= t <= dates[-1] and t not in shown]
+    if not edges:
+        return inside
+    at = np.sort(np.concatenate([shown.astype('datetime64[ns]'), edges]))
+    # the rows next to each edge are enough to interpolate it
+    first, stop = max(dates.searchsorted(start) - 1, 0), dates.searchsorted(end, 'right') + 1
+    nearby = data.iloc[first:stop]
+    return align(at, {name: (nearby[column], nearby[name]) for name in data.columns if name != column}, column=column)
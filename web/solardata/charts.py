@@ -0,0 +1,123 @@
+"""Chart data layer: send the browser only what an Altair chart draws.
+
+:func:`slim` cuts every data frame of a chart down to the fields its
+encodings, conditions and tooltips use. Layers that draw the same frame get one
+shared trimmed copy, so Altair still embeds it once for the whole layer
+chart. :func:`downsample` thins long line series to about the number of
+points a chart can show, with Largest-Triangle-Three-Buckets, which keeps
+peaks and dips. Chart payloads then stay flat as the history grows.
+"""
+import re
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+# roughly the pixel width of a chart on a wide page
+MAX_POINTS = 1000
+
+_SUBCHARTS = ('layer', 'hconcat', 'vconcat', 'concat')
+_DATUM = re.compile(r"datum\.(\w+)|datum\[['\"](.+?)['\"]\]")
+
+
+def lttb(x, y, threshold):
+    """Indices of ``threshold`` points of ``(x, y)`` chosen by Largest-Triangle-Three-Buckets."""
+    x, y = np.asarray(x, 'float64'), np.asarray(y, 'float64')
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # the first and last point are kept, the rest is split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype('int64')
+    selected = np.empty(threshold, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # the third corner is the mean of the next bucket (the last point after the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample(data, x, y, max_points=MAX_POINTS):
+    """Rows of ``data`` (sorted by ``x``) thinned to about ``max_points`` with LTTB on each ``y`` column."""
+    if len(data) <= max_points:
+        return data
+    data = data.sort_values(x)
+    ys = [y] if isinstance(y, str) else list(y)
+    position = data[x].to_numpy()
+    if np.issubdtype(position.dtype, np.datetime64):
+        position = position.astype('datetime64[ns]').astype('int64')
+    keep = np.zeros(len(data), dtype=bool)
+    for column in ys:
+        # gaps are bridged for choosing points only; the kept rows are unchanged
+        values = data[column].astype('float64').interpolate(limit_direction='both').fillna(0)
+        keep[lttb(position, values, max_points // len(ys))] = True
+    return data[keep]
+
+
+def _to_dict(value, frame):
+    if hasattr(value, 'to_dict'):
+        return value.to_dict(validate=False, context={'data': frame})
+    if isinstance(value, dict):
+        return {k: _to_dict(v, frame) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_dict(v, frame) for v in value]
+    return value
+
+
+def _collect(spec, found):
+    if isinstance(spec, dict):
+        if isinstance(spec.get('field'), str):
+            found.add(spec['field'])
+        for value in spec.values():
+            _collect(value, found)
+    elif isinstance(spec, list):
+        for value in spec:
+            _collect(value, found)
+    elif isinstance(spec, str):
+        found.update(a or b for a, b in _DATUM.findall(spec))
+
+
+def _subcharts(chart):
+    return [(key, list(chart[key])) for key in _SUBCHARTS
+            if key in chart._kwds and chart[key] is not alt.Undefined]
+
+
+def _fields(chart, frame, fields, frames):
+    # fields each frame needs, keyed by id() since several charts may draw the same frame
+    if isinstance(chart.data, pd.DataFrame):
+        frame = chart.data
+        frames[id(frame)] = frame
+    if frame is not None:
+        own = {k: v for k, v in chart._kwds.items()
+               if k not in ('data', 'datasets', *_SUBCHARTS) and v is not alt.Undefined}
+        _collect(_to_dict(own, frame), fields.setdefault(id(frame), set()))
+    for _, charts in _subcharts(chart):
+        for sub in charts:
+            _fields(sub, frame, fields, frames)
+
+
+def _rebuild(chart, trimmed):
+    chart = chart.copy(deep=False)
+    if isinstance(chart.data, pd.DataFrame):
+        chart.data = trimmed[id(chart.data)]
+    for key, charts in _subcharts(chart):
+        chart[key] = [_rebuild(sub, trimmed) for sub in charts]
+    return chart
+
+
+def slim(chart):
+    """Copy of ``chart`` whose data frames only keep the columns it uses."""
+    fields, frames = {}, {}
+    _fields(chart, None, fields, frames)
+    trimmed = {}
+    for key, frame in frames.items():
+        used = [c for c in frame.columns if c in fields.get(key, ())]
+        # a frame none of whose fields could be found is sent as it is
+        trimmed[key] = frame[used] if used else frame
+    return _rebuild(chart, trimmed)
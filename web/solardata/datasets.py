@@ -0,0 +1,60 @@
+"""The EasyGreen and Energinet datasets as the notebooks and the dashboard use them.
+
+One place owns how the raw files are parsed, how ages are joined and which
+rows count as outliers (:func:`store.is_outlier`). Notebooks add ``web`` to
+``sys.path`` and load from here. They then get the same prepared artifacts as
+the dashboard:
+- the household store, cleaned
+- the raw daily rows, memoized on disk
+- the time series store
+"""
+import pandas as pd
+
+from . import memo, paths, store, timeseries
+
+# customer ages kept for the age analysis; ages outside are missing or implausible birth dates
+AGE_RANGE = (18, 99)
+
+
+@memo.on_disk(paths.HOUSEHOLD_CSV, paths.AGE_CSV)
+def raw_household():
+    """Every row and column of ``dfMerged.csv`` with parsed dates and the ages of the users table."""
+    data = pd.read_csv(paths.HOUSEHOLD_CSV)
+    data['usage_date'] = pd.to_datetime(data['usage_date'])
+    data = data.drop(columns=['age'], errors='ignore')
+    return store.join_users(data, ['age', 'age_group'], store.read_users())
+
+
+def within_ages(data, age_range=AGE_RANGE):
+    """Rows of ``data`` whose ``age`` lies in ``age_range``, both ends included."""
+    return data[data['age'].between(*age_range)]
+
+
+def household(columns=None, adults=False):
+    """Cleaned daily rows of the household store, only of ``AGE_RANGE`` customers with ``adults``.
+
+    ``columns`` may include ``age`` and ``age_group``, which are joined from
+    the users table; without ``columns`` both are. ``user_id`` is a plain
+    integer column here, unlike in the dashboard's cache.
+    """
+    columns = list(columns or [*store.HOUSEHOLD_COLUMNS, 'age', 'age_group'])
+    joined = [c for c in ('age', 'age_group') if c in columns or (adults and c == 'age')]
+    stored = [c for c in columns if c in store.HOUSEHOLD_COLUMNS]
+    if joined and 'user_id' not in stored:
+        stored.insert(0, 'user_id')
+    data = store.load_household(stored)
+    if joined:
+        data = store.join_users(data, joined)
+    data['user_id'] = data['user_id'].astype('int32')
+    data = within_ages(data) if adults else data
+    return data[[c for c in data.columns if c in columns]]
+
+
+def weekly_production():
+    """Weekly Energinet production with its running total, from the time series store."""
+    return timeseries.load_timeseries()['weekly']
+
+
+def trends():
+    """Google Trends search index and gas prices aligned on common dates."""
+    return timeseries.load_timeseries()['trends']
@@ -0,0 +1,53 @@
+"""Sidebar filters of the household pages as a single boolean mask.
+
+Every predicate is evaluated on the underlying NumPy arrays and combined into
+one mask, so the frame is only indexed once, after all filters are applied.
+"""
+import numpy as np
+import pandas as pd
+
+AGE_GROUPS = ["18-44", "45-53", "54-63", "64-99"]
+# right-closed age intervals (17, 44], (44, 53], (53, 64], (64, 99] of the groups above
+AGE_EDGES = np.array([17, 44, 53, 64, 99])
+
+
+def age_group_codes(age):
+    """Index into ``AGE_GROUPS`` for each age, -1 for ages outside every group."""
+    age = np.asarray(age, dtype='float64')
+    codes = np.searchsorted(AGE_EDGES, age, side='left') - 1
+    codes[(codes >= len(AGE_GROUPS)) | np.isnan(age)] = -1
+    return codes
+
+
+def household_mask(data, date_range=None, age_groups=None, production_range=None,
+                   date_column='usage_date', production_column='totalProductPower'):
+    """Boolean array selecting the rows of ``data`` that pass every given filter.
+
+    ``date_range`` and ``production_range`` are inclusive ``(low, high)`` pairs and
+    ``age_groups`` a list of labels from ``AGE_GROUPS``, matched against the
+    precomputed ``age_group`` codes of the users table (see
+    :func:`solardata.store.join_users`). Filters left as ``None`` or empty are not applied.
+    """
+    mask = np.ones(len(data), dtype=bool)
+
+    if date_range is not None:
+        low, high = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+        dates = data[date_column].to_numpy()
+        mask &= (dates >= low.to_datetime64()) & (dates <= high.to_datetime64())
+
+    if age_groups:
+        selected = np.zeros(len(AGE_GROUPS) + 1, dtype=bool)  # last entry is code -1
+        selected[[AGE_GROUPS.index(g) for g in age_groups]] = True
+        mask &= selected[data['age_group'].to_numpy()]
+
+    if production_range is not None:
+        production = data[production_column].to_numpy()
+        mask &= (production >= production_range[0]) & (production <= production_range[1])
+
+    return mask
+
+
+def filter_households(data, **filters):
+    """Rows of ``data`` that pass every filter of :func:`household_mask`."""
+    mask = household_mask(data, **filters)
+    return data if mask.all() else data[mask]
@@ -0,0 +1,190 @@
+"""Batch geocoding of customer addresses through the LocationIQ search API.
+
+Addresses are normalized and looked up in a persistent SQLite cache first, so
+every address is only requested once and an interrupted batch resumes where it
+stopped. The remaining addresses are geocoded by a small thread pool that
+shares a token-bucket rate limit, and failed requests are retried with
+exponential backoff; a rejected API key stops the batch at once. ``base_url`` can point at a local stub server for testing.
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import requests
+
+from . import paths
+
+LOCATIONIQ_URL = "https://us1.locationiq.com/v1/search.php"
+
+# statuses stored in the cache; failed lookups are not stored and retried next time
+FOUND = 'found'
+NOT_FOUND = 'not_found'
+
+
+class GeocodeError(RuntimeError):
+    """The API rejected the request in a way retrying will not fix, e.g. a bad key."""
+
+
+def clean_addresses(address):
+    """Remove stray characters and line breaks from a Series of addresses."""
+    # Replace unwanted characters with a space or remove them
+    address = address.str.replace(r'[@#*]', '', regex=True)  # Remove @, #, *
+    address = address.str.replace(r'[\n\r]', ' ', regex=True)  # Replace newlines with space
+    address = address.str.strip()  # Strip leading/trailing whitespace
+    return address
+
+
+def normalize_addresses(address):
+    """Cache keys for a Series of addresses: cleaned, lower case, single spaces."""
+    return clean_addresses(address.fillna('').astype(str)).str.lower().str.split().str.join(' ')
+
+
+class TokenBucket:
+    """Thread-safe rate limiter allowing ``rate`` requests per second on average."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class GeocodeCache:
+    """Results of earlier lookups keyed by normalized address, stored in SQLite."""
+
+    def __init__(self, path=None):
+        self.path = path or paths.GEOCODE_CACHE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS geocode "
+                                "(address TEXT PRIMARY KEY, latitude REAL, longitude REAL, status TEXT)")
+
+    def lookup(self, addresses):
+        """Cached ``address -> (latitude, longitude)`` for the given addresses."""
+        found = {}
+        addresses = list(addresses)
+        for i in range(0, len(addresses), 500):
+            batch = addresses[i:i + 500]
+            rows = self.connection.execute(
+                f"SELECT address, latitude, longitude FROM geocode WHERE address IN ({','.join('?' * len(batch))})",
+                batch)
+            found.update((address, (lat, lon)) for address, lat, lon in rows)
+        return found
+
+    def store(self, address, latitude, longitude, status):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?)",
+                                    (address, latitude, longitude, status))
+
+    def close(self):
+        self.connection.close()
+
+
+def geocode_address(session, address, api_key, base_url=LOCATIONIQ_URL, limiter=None,
+                    retries=4, backoff=1.0, timeout=10):
+    """``(latitude, longitude, status)`` for one address; status is None if every attempt failed."""
+    params = {"key": api_key, "q": address, "format": "json"}
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            response = session.get(base_url, params=params, timeout=timeout)
+        except requests.RequestException:
+            response = None
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            if len(data) > 0:
+                return float(data[0]['lat']), float(data[0]['lon']), FOUND
+            return None, None, NOT_FOUND
+        if response is not None and response.status_code == 404:
+            # LocationIQ answers 404 when it has no results for the address
+            return None, None, NOT_FOUND
+        if response is not None and response.status_code in (401, 403):
+            raise GeocodeError(f"LocationIQ rejected the request (HTTP {response.status_code}), check the API key")
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+    return None, None, None
+
+
+def geocode_batch(addresses, api_key, base_url=LOCATIONIQ_URL, rate=1.0, workers=4,
+                  cache_path=None, retries=4, backoff=1.0, progress=print):
+    """Latitude and longitude for a Series of addresses, aligned with its index.
+
+    Only addresses missing from the cache are requested, at most ``rate`` requests
+    per second over ``workers`` threads. Every result is written to the cache as
+    soon as it arrives, so a batch can be interrupted and run again. Raises
+    ``GeocodeError`` without requesting the remaining addresses if the key is rejected.
+    """
+    keys = normalize_addresses(addresses)
+    cache = GeocodeCache(cache_path)
+    try:
+        results = cache.lookup(keys.unique())
+        todo = [k for k in keys.unique() if k and k not in results]
+        if progress:
+            progress(f"{len(results)} addresses cached, {len(todo)} to geocode")
+
+        limiter = TokenBucket(rate)
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(geocode_address, session, key, api_key, base_url, limiter, retries, backoff): key
+                       for key in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                key = futures[future]
+                try:
+                    lat, lon, status = future.result()
+                except GeocodeError:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                if status is not None:
+                    cache.store(key, lat, lon, status)
+                    results[key] = (lat, lon)
+                if progress and done % 100 == 0:
+                    progress(f"{done}/{len(todo)} geocoded")
+    finally:
+        cache.close()
+
+    coordinates = [results.get(k, (None, None)) for k in keys]
+    return pd.DataFrame(coordinates, index=addresses.index, columns=['latitude', 'longitude'], dtype='float64')
+
+
+def user_locations(path=None, cache_path=None):
+    """Latitude and longitude per ``user_id`` from the geocoded address table.
+
+    Addresses the table has no coordinates for are looked up in the geocode
+    cache; nothing is requested from the API. Users found in neither are left out.
+    """
+    path = path or paths.ADDRESS_CSV
+    cache_path = cache_path or paths.GEOCODE_CACHE
+    if not path.exists():
+        return pd.DataFrame(columns=['latitude', 'longitude'], dtype='float64').rename_axis('user_id')
+    wanted = ('user_id', 'address', 'latitude', 'longitude')
+    table = pd.read_csv(path, usecols=lambda c: c in wanted).dropna(subset=['user_id'])
+    table = table.reindex(columns=list(wanted))
+    missing = table['latitude'].isna() & table['address'].notna()
+    if missing.any() and cache_path.exists():
+        keys = normalize_addresses(table.loc[missing, 'address'])
+        cache = GeocodeCache(cache_path)
+        try:
+            found = cache.lookup(keys.unique())
+        finally:
+            cache.close()
+        coordinates = [found.get(k, (None, None)) for k in keys]
+        table.loc[missing, ['latitude', 'longitude']] = np.array(coordinates, dtype='float64')
+    table['user_id'] = table['user_id'].astype('int64')
+    return table.dropna(subset=['latitude', 'longitude']).groupby('user_id')[['latitude', 'longitude']].first()
@@ -0,0 +1,78 @@
+"""Server-side hexagon binning for the map page.
+
+Mirrors what pydeck's ``HexagonLayer`` computes in the browser with its default
+settings: hexagons of 1 km radius, an elevation value that is the sum of the
+elevation weight per hexagon, an elevation scaled linearly onto
+``elevation_range`` and a colour quantized from the number of points. Only the
+binned cells are then sent to the browser and drawn as a hexagonal
+``ColumnLayer``.
+"""
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS = 6378137.0
+# deck.gl HexagonLayer defaults
+HEX_RADIUS = 1000
+COLOR_RANGE = [[255, 255, 178], [254, 217, 118], [254, 178, 76],
+               [253, 141, 60], [240, 59, 32], [189, 0, 38]]
+
+
+def _mercator(longitude, latitude):
+    x = EARTH_RADIUS * np.radians(longitude)
+    y = EARTH_RADIUS * np.log(np.tan(np.pi / 4 + np.radians(latitude) / 2))
+    return x, y
+
+
+def _lnglat(x, y):
+    return np.degrees(x / EARTH_RADIUS), np.degrees(2 * np.arctan(np.exp(y / EARTH_RADIUS)) - np.pi / 2)
+
+
+def _hex_round(q, r):
+    # round fractional axial coordinates to the nearest hexagon (cube coordinate rounding)
+    s = -q - r
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype('int64'), rr.astype('int64')
+
+
+def hexbin(longitude, latitude, weight, radius=HEX_RADIUS):
+    """Pointy-top hexagons of ``radius`` metres with the point count and weight sum of each.
+
+    The grid is laid out in Web Mercator, with the radius corrected for the
+    projection's stretch at the mean latitude of the points.
+    """
+    longitude, latitude = np.asarray(longitude, 'float64'), np.asarray(latitude, 'float64')
+    x, y = _mercator(longitude, latitude)
+    size = radius / np.cos(np.radians(np.mean(latitude))) if len(latitude) else radius
+
+    q, r = _hex_round((np.sqrt(3) / 3 * x - y / 3) / size, (2 / 3 * y) / size)
+    cells = pd.DataFrame({'q': q, 'r': r, 'weight': np.asarray(weight, 'float64')})
+    cells = cells.groupby(['q', 'r'])['weight'].agg(['size', 'sum']).reset_index()
+
+    cx = size * np.sqrt(3) * (cells['q'] + cells['r'] / 2)
+    cy = size * 1.5 * cells['r']
+    lng, lat = _lnglat(cx.to_numpy(), cy.to_numpy())
+    return pd.DataFrame({'longitude': lng, 'latitude': lat,
+                         'count': cells['size'].to_numpy(), 'elevationValue': cells['sum'].to_numpy()})
+
+
+def _rescale(values, target):
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(len(values))
+    return (values - low) / (high - low) * target
+
+
+def hex_cells(data, weight_column, elevation_range, radius=HEX_RADIUS):
+    """Binned cells of ``data`` with the ``elevation`` and ``color`` HexagonLayer would draw."""
+    cells = hexbin(data['longitude'], data['latitude'], data[weight_column], radius)
+    if cells.empty:
+        return cells.assign(elevation=[], color=[])
+    cells['elevation'] = elevation_range[0] + _rescale(cells['elevationValue'], elevation_range[1] - elevation_range[0])
+    color = np.minimum(_rescale(cells['count'], len(COLOR_RANGE)).astype(int), len(COLOR_RANGE) - 1)
+    cells['color'] = [COLOR_RANGE[i] for i in color]
+    return cells
@@ -0,0 +1,36 @@
+"""Prepare the columnar data store used by the dashboard.
+
+Run from the ``web`` directory after a new data export::
+
+    python -m solardata.ingest
+"""
+import argparse
+
+from . import aggregates, metrics, paths, rollup, schema, store, timeseries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--chunksize', type=int, default=timeseries.CHUNKSIZE,
+                        help="rows of energinetForecast.csv parsed at a time")
+    args = parser.parse_args(argv)
+
+    data = store.build_household_store()
+    print(f"household: {len(data)} rows -> {paths.HOUSEHOLD_STORE}")
+    report = schema.memory_report(store.load_household())
+    print(f"household memory use ({schema.MEMORY_BUDGET:.0f} MB budget):")
+    print(report.to_string(formatters={'MB': '{:.1f}'.format, 'share': '{:.0%}'.format}))
+    stats = aggregates.build_user_stats()
+    print(f"user stats: {len(stats)} users -> {paths.USER_STATS_STORE}")
+    metrics.build_metrics()
+    print(f"metrics: {len(metrics.load_metrics())} households -> {paths.METRICS_STORE}")
+    cube = rollup.load_rollup()
+    print(f"monthly rollup: {len(cube)} cells -> {paths.ROLLUP_STORE}")
+    timeseries.update_timeseries(chunksize=args.chunksize)
+    series = timeseries.load_timeseries()
+    print(f"time series: {len(series['weekly'])} weeks -> {paths.TIMESERIES_STORE}")
+    print("production pyramid: " + ', '.join(f"{len(series[level])} {level}s" for level in timeseries.LEVELS))
+
+
+if __name__ == '__main__':
+    main()
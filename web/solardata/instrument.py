@@ -0,0 +1,148 @@
+"""Opt-in timing of the dashboard's hot paths.
+
+Code marks its stages with :func:`stage`. While a run started with
+:func:`start_run` is instrumented, every stage records:
+- its wall time
+- the rows going in and out
+- the peak memory traced by ``tracemalloc`` while it ran
+
+Streamlit runs each session's script in its own thread, so records are kept
+per thread and per rerun.
+
+Each finished stage is logged as one JSON line to the ``solardata.instrument``
+logger. With ``SOLARDATA_INSTRUMENT_LOG`` set, those lines are also appended
+to that file. ``SOLARDATA_INSTRUMENT=1`` instruments every run. Otherwise the
+dashboard only instruments runs opened with ``?debug=<token>``, where the
+token is the value of ``SOLARDATA_DEBUG_TOKEN`` (see :func:`debug_allowed`).
+
+``tracemalloc`` traces the whole process and slows every allocation down, so
+only one run at a time traces memory, and tracing stops when :func:`end_run`
+ends that run. Runs instrumented at the same time only record their wall
+time and rows; their ``peak_mb`` is left empty.
+"""
+import contextlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('SOLARDATA_INSTRUMENT', '') not in ('', '0')
+DEBUG_TOKEN = os.environ.get('SOLARDATA_DEBUG_TOKEN')
+LOG_FILE = os.environ.get('SOLARDATA_INSTRUMENT_LOG')
+if LOG_FILE:
+    _handler = logging.FileHandler(LOG_FILE)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_local = threading.local()
+# held by the one run that traces memory
+_tracing = threading.Lock()
+
+
+class Stage:
+    """Measurements of one stage; set ``rows_out`` inside the ``with`` block."""
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.seconds = None
+        self.peak_bytes = None
+        self._base = 0
+        self._peak = 0
+
+
+def debug_allowed(value):
+    """Whether a run opened with ``?debug=<value>`` may be instrumented and show its timings.
+
+    ``value`` has to match ``SOLARDATA_DEBUG_TOKEN``. Without a token, ``1``
+    is accepted only if ``SOLARDATA_INSTRUMENT`` is set.
+    """
+    if not value:
+        return False
+    if DEBUG_TOKEN:
+        return hmac.compare_digest(value.encode(), DEBUG_TOKEN.encode())
+    return ENABLED and value == '1'
+
+
+def start_run(enabled=None, **context):
+    """Start collecting the stages of one script run; ``context`` is added to every record.
+
+    Returns whether this run is instrumented, which is ``ENABLED`` unless
+    ``enabled`` is given. Call :func:`end_run` when the run is over.
+    """
+    end_run()
+    enabled = ENABLED if enabled is None else enabled
+    _local.records = [] if enabled else None
+    _local.stack = []
+    _local.context = {'run': uuid.uuid4().hex[:8], **context}
+    if enabled and _tracing.acquire(blocking=False):
+        _local.tracing = True
+        # tracing turned on outside this module, e.g. with python -X tracemalloc, is left on
+        _local.started = not tracemalloc.is_tracing()
+        if _local.started:
+            tracemalloc.start()
+    return enabled
+
+
+def end_run():
+    """Stop tracing memory if this thread's run traced it; its records stay readable."""
+    if getattr(_local, 'tracing', False):
+        _local.tracing = False
+        if _local.started:
+            tracemalloc.stop()
+        _tracing.release()
+
+
+def records():
+    """Records of the stages finished so far in this thread's run."""
+    return list(getattr(_local, 'records', None) or [])
+
+
+def export_jsonl(items=None):
+    """Records as JSON lines, e.g. for a download."""
+    return ''.join(json.dumps(r) + '\n' for r in (records() if items is None else items))
+
+
+@contextlib.contextmanager
+def stage(name, rows_in=None):
+    """Time the enclosed block as stage ``name`` if the current run is instrumented."""
+    current = Stage(name, rows_in)
+    collected = getattr(_local, 'records', None)
+    if collected is None:
+        yield current
+        return
+
+    stack = _local.stack
+    tracing = getattr(_local, 'tracing', False)
+    if tracing:
+        traced, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # the enclosing stage keeps the peak it reached before this one starts
+            stack[-1]._peak = max(stack[-1]._peak, peak)
+        tracemalloc.reset_peak()
+        current._base = traced
+    stack.append(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - start
+        stack.pop()
+        if tracing:
+            peak = max(tracemalloc.get_traced_memory()[1], current._peak)
+            current.peak_bytes = peak - current._base
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+        record = {**_local.context, 'stage': name, 'depth': len(stack), 'seconds': round(current.seconds, 6),
+                  'rows_in': current.rows_in, 'rows_out': current.rows_out,
+                  'peak_mb': None if current.peak_bytes is None else round(current.peak_bytes / 2**20, 3)}
+        collected.append(record)
+        logger.info(json.dumps(record))
@@ -0,0 +1,39 @@
+"""Results of slow loaders memoized on disk.
+
+:func:`on_disk` stores the frame a function returns as Parquet under
+``paths.MEMO_STORE``. The file name is keyed by the function, its source code
+and its arguments. The stored copy is used as long as it is newer than every
+source file of the function. A notebook kernel and the dashboard therefore
+share one prepared copy instead of each parsing the raw CSVs again, and
+editing the function or the data rebuilds it.
+"""
+import functools
+import hashlib
+import inspect
+
+import pandas as pd
+
+from . import paths, store
+
+
+def _digest(text, length):
+    return hashlib.sha1(text.encode()).hexdigest()[:length]
+
+
+def on_disk(*sources):
+    """Decorator memoizing a function that returns a DataFrame, rebuilt when a ``sources`` path changes."""
+    def decorate(func):
+        code = _digest(inspect.getsource(func), 8)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _digest(repr((args, sorted(kwargs.items()))), 12)
+            path = paths.MEMO_STORE / f'{func.__module__}.{func.__name__}-{code}-{key}.parquet'
+            if not store.is_stale(path, sources):
+                return pd.read_parquet(path)
+            data = func(*args, **kwargs)
+            store.write_parquet(data, path)
+            return data
+
+        return wrapper
+    return decorate
@@ -0,0 +1,88 @@
+"""Derived energy metrics per household and per household-month.
+
+All metrics are shares of two power columns, computed as a ratio of sums
+over the period rather than a mean of daily ratios:
+- ``self_use_ratio``: the share of production used at home.
+- ``self_sufficiency``: the share of usage covered by own production
+  (autarky).
+- ``night_share``: the share of usage between 18:00 and 06:00.
+- ``grid_share``: the share of usage bought from the grid.
+
+A day with next to no production therefore cannot swing a household's ratio.
+A ratio is undefined (NaN) where its denominator is below
+``MIN_DENOMINATOR``. Meter glitches that would push a share outside [0, 1]
+are clipped.
+
+The household and household-month tables come from one groupby over the
+household store. They are stored next to it, so pages and notebooks read
+them instead of redoing the arithmetic. :func:`ratios` also works on single
+days or on any table of sums.
+"""
+import pandas as pd
+
+from . import paths, store
+
+# metric -> (numerator, denominator)
+METRICS = {
+    'self_use_ratio': ('totalSelfUsePower', 'totalProductPower'),
+    'self_sufficiency': ('totalSelfUsePower', 'totalUsePower'),
+    'night_share': ('night_usage', 'totalUsePower'),
+    'grid_share': ('totalBuyPower', 'totalUsePower'),
+}
+SUM_COLUMNS = ['totalProductPower', 'totalSelfUsePower', 'totalUsePower', 'night_usage', 'totalBuyPower']
+# kWh; smaller denominators give no meaningful share
+MIN_DENOMINATOR = 0.01
+
+HOUSEHOLD_FILE = 'household.parquet'
+HOUSEHOLD_MONTH_FILE = 'household_month.parquet'
+
+
+def ratios(sums):
+    """Every metric of a frame holding the ``SUM_COLUMNS``, row by row."""
+    result = pd.DataFrame(index=sums.index)
+    for name, (numerator, denominator) in METRICS.items():
+        valid = sums[denominator].astype('float64').where(sums[denominator] >= MIN_DENOMINATOR)
+        result[name] = (sums[numerator].astype('float64') / valid).clip(0, 1).astype('float32')
+    return result
+
+
+def household_month_metrics(data):
+    """Sums, number of days and metrics per user and calendar month of the daily rows in ``data``."""
+    month = pd.to_datetime(data['usage_date']).dt.to_period('M').dt.start_time.rename('month')
+    keys = [data['user_id'].astype('int32'), month]
+    grouped = data[SUM_COLUMNS].astype('float64').groupby(keys)
+    sums = grouped.sum(min_count=1)
+    sums.insert(0, 'days', grouped.size().astype('int32'))
+    return pd.concat([sums, ratios(sums)], axis=1).reset_index()
+
+
+def household_metrics(data=None, months=None):
+    """Sums, number of days and metrics per user, from daily rows or from :func:`household_month_metrics`."""
+    months = household_month_metrics(data) if months is None else months
+    sums = months.groupby('user_id')[['days', *SUM_COLUMNS]].sum(min_count=1)
+    return pd.concat([sums, ratios(sums)], axis=1).reset_index()
+
+
+@store.locked
+def build_metrics(store_dir=None):
+    """Compute both metric tables from the household store and write them."""
+    store_dir = store_dir or paths.METRICS_STORE
+    months = household_month_metrics(store.load_household(['user_id', 'usage_date', *SUM_COLUMNS]))
+    store.write_parquet(months, store_dir / HOUSEHOLD_MONTH_FILE)
+    # written last, as the staleness check looks at this file
+    store.write_parquet(household_metrics(months=months), store_dir / HOUSEHOLD_FILE)
+    return store_dir
+
+
+def ensure_metrics(store_dir=None):
+    """(Re)build the metric tables if the household store changed."""
+    store_dir = store_dir or paths.METRICS_STORE
+    sources = [store.ensure_household_store()]
+    store.build_once(lambda: store.is_stale(store_dir / HOUSEHOLD_FILE, sources), lambda: build_metrics(store_dir))
+    return store_dir / HOUSEHOLD_FILE
+
+
+def load_metrics(monthly=False, store_dir=None):
+    """Metrics per household, or per household and month with ``monthly``."""
+    path = ensure_metrics(store_dir)
+    return pd.read_parquet(path.with_name(HOUSEHOLD_MONTH_FILE) if monthly else path)
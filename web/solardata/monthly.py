@@ -0,0 +1,10 @@
+"""Months and columns of the Production Development page's monthly averages.
+
+The averages themselves come from the rollup cube, see :mod:`solardata.rollup`.
+"""
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+               'September', 'October', 'November', 'December']
+MONTHLY_COLUMNS = ['totalProductPower', 'totalSelfUsePower', 'totalUsePower', 'night_usage']
+
+# daily production is clipped to this range before averaging
+PRODUCTION_CLIP = (0, 10000)
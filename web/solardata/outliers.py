@@ -0,0 +1,121 @@
+"""Per-household outlier detection with robust statistics.
+
+A fixed kWh limit misses most meter glitches: a system that normally makes
+10 kWh a day and reports 400 is still below 500. Each household is
+therefore judged against its own days in the same calendar month, which
+keeps sunny summer days from looking like spikes against a winter median.
+From the median and the median absolute deviation (MAD) of each power
+column per user and month, every day gets a robust z-score:
+
+    z = (value - median) / (1.4826 * MAD)
+
+A day is anomalous when any column scores above its ``RULES`` threshold.
+Only spikes count, since days with little sun or usage are normal. The MAD
+is floored at ``MIN_SCALE`` kWh, so households with many identical days do
+not flag every other day. Months of a household with fewer than
+``MIN_DAYS`` days are not judged. Everything is one grouped pass over the rows.
+
+``SOLARDATA_OUTLIER_MODE`` sets what the store does with anomalous days:
+``drop`` them (the default), ``clip`` them to their threshold, or keep them
+as they are (``off``).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+# column -> robust z-score above which a day is anomalous for its household
+RULES = {
+    'totalUsePower': 8.0,
+    'totalProductPower': 8.0,
+    'totalSelfUsePower': 8.0,
+    'totalBuyPower': 8.0,
+}
+# MAD of normally distributed values -> standard deviation
+CONSISTENCY = 1.4826
+# kWh; smallest scale a household's spread is measured in
+MIN_SCALE = 1.0
+MIN_DAYS = 14
+
+MODES = ('drop', 'clip', 'off')
+MODE = os.environ.get('SOLARDATA_OUTLIER_MODE', 'drop')
+if MODE not in MODES:
+    raise ValueError(f"SOLARDATA_OUTLIER_MODE must be one of {', '.join(MODES)}, not {MODE!r}")
+
+
+def _keys(data):
+    months = pd.to_datetime(data['usage_date']).dt.month.astype('int8')
+    return pd.MultiIndex.from_arrays([data['user_id'].astype('int32').to_numpy(), months.to_numpy()],
+                                     names=['user_id', 'month'])
+
+
+def household_stats(data, columns=None):
+    """Days, median and MAD of each column per ``user_id`` and calendar month."""
+    columns = list(columns or RULES)
+    keys = _keys(data)
+    values = data[columns].astype('float64').set_axis(keys)
+    grouped = values.groupby(level=[0, 1])
+    median = grouped.median()
+    # absolute deviations from each row's own household and month median
+    deviation = (values - median.reindex(keys).to_numpy()).abs()
+    mad = deviation.groupby(level=[0, 1]).median()
+    stats = pd.concat([median.add_suffix('_median'), mad.add_suffix('_mad')], axis=1)
+    stats.insert(0, 'days', grouped.size().astype('int32'))
+    return stats
+
+
+def _per_row(data, stats):
+    # the stats of each row's household and month; NaN where there are none
+    return stats.reindex(_keys(data))
+
+
+def _limits(rows, column):
+    median = rows[f'{column}_median'].to_numpy()
+    return median, np.maximum(CONSISTENCY * rows[f'{column}_mad'].to_numpy(), MIN_SCALE)
+
+
+def scores(data, stats=None, rules=None):
+    """Robust z-score of every ``rules`` column of every row; NaN where a household is not judged."""
+    rules = rules or RULES
+    stats = household_stats(data, rules) if stats is None else stats
+    rows = _per_row(data, stats)
+    judged = rows['days'].to_numpy() >= MIN_DAYS
+    result = pd.DataFrame(index=data.index)
+    for column in rules:
+        median, scale = _limits(rows, column)
+        z = (data[column].to_numpy(dtype='float64') - median) / scale
+        result[column] = np.where(judged, z, np.nan)
+    return result
+
+
+def anomalous(data, stats=None, rules=None):
+    """Boolean array marking the days of ``data`` with a spike in any ``rules`` column."""
+    rules = rules or RULES
+    z = scores(data, stats, rules)
+    return (z.to_numpy() > np.array([rules[c] for c in z.columns])).any(axis=1)
+
+
+def clip(data, stats=None, rules=None):
+    """Copy of ``data`` with every spike lowered to its household's ``rules`` threshold."""
+    rules = rules or RULES
+    stats = household_stats(data, rules) if stats is None else stats
+    rows = _per_row(data, stats)
+    judged = rows['days'].to_numpy() >= MIN_DAYS
+    data = data.copy()
+    for column, threshold in rules.items():
+        median, scale = _limits(rows, column)
+        limit = np.where(judged, median + threshold * scale, np.inf)
+        data[column] = np.minimum(data[column].to_numpy(dtype='float64'), limit).astype(data[column].dtype)
+    return data
+
+
+def apply(data, stats=None, mode=None, rules=None):
+    """``data`` with its anomalous days dropped, clipped or kept as ``mode`` (by default ``MODE``) says."""
+    mode = mode or MODE
+    if mode == 'drop':
+        return data[~anomalous(data, stats, rules)]
+    if mode == 'clip':
+        return clip(data, stats, rules)
+    if mode == 'off':
+        return data
+    raise ValueError(f"outlier mode must be one of {', '.join(MODES)}, not {mode!r}")
@@ -0,0 +1,26 @@
+"""Locations of the raw data files and the prepared columnar store."""
+import os
+from pathlib import Path
+
+# final/data in the repository, can be pointed elsewhere (e.g. for synthetic data)
+DATA_DIR = Path(os.environ.get('SOLARDATA_DATA_DIR', Path(__file__).resolve().parents[2] / 'final' / 'data'))
+STORE_DIR = Path(os.environ.get('SOLARDATA_STORE_DIR', DATA_DIR / 'store'))
+
+HOUSEHOLD_CSV = DATA_DIR / 'dfMerged.csv'
+AGE_CSV = DATA_DIR / 'user_id-age.csv'
+# user_id, address and geocoded latitude/longitude, written by the preprocessing notebook
+ADDRESS_CSV = DATA_DIR / 'addressData.csv'
+ENERGINET_CSV = DATA_DIR / 'energinetForecast.csv'
+GOOGLE_TRENDS_CSV = DATA_DIR / 'multiTimeline.csv'
+GAS_PRICES_CSV = DATA_DIR / 'gasPrices.csv'
+
+HOUSEHOLD_STORE = STORE_DIR / 'household'
+USERS_STORE = STORE_DIR / 'users.parquet'
+OUTLIER_STATS = STORE_DIR / 'outlier_stats.parquet'
+USER_STATS_STORE = STORE_DIR / 'user_stats.parquet'
+ROLLUP_STORE = STORE_DIR / 'monthly_rollup.parquet'
+METRICS_STORE = STORE_DIR / 'metrics'
+TIMESERIES_STORE = STORE_DIR / 'timeseries'
+GEOCODE_CACHE = STORE_DIR / 'geocode_cache.sqlite'
+MEMO_STORE = STORE_DIR / 'memo'
+EXTRACT_STATE = STORE_DIR / 'extract_state.json'
@@ -0,0 +1,80 @@
+"""Monthly rollup cube of the household table.
+
+Sums and counts of ``MONTHLY_COLUMNS`` per (month, age group, coarse geo cell)
+are computed once from the household store. Monthly means for any combination
+of age groups and cells are then a re-aggregation over a few hundred rows
+instead of a scan of every daily row.
+"""
+import numpy as np
+import pandas as pd
+
+from . import paths, store
+from .filters import AGE_GROUPS
+from .monthly import MONTH_NAMES, MONTHLY_COLUMNS, PRODUCTION_CLIP
+
+# size of the geo cells in degrees; households without coordinates get cell -1
+GEO_CELL_DEGREES = 0.5
+ROLLUP_KEYS = ['usage_month', 'age_group', 'lat_cell', 'lon_cell']
+
+
+def geo_cells(latitude, longitude, size=GEO_CELL_DEGREES):
+    """Integer (lat, lon) cell indices of a coarse degree grid, -1 where missing."""
+    cells = []
+    for values in (latitude, longitude):
+        values = np.asarray(values, dtype='float64')
+        cell = np.floor(values / size)
+        cells.append(np.where(np.isnan(cell), -1, cell).astype('int16'))
+    return cells
+
+
+def build_rollup_cube(data):
+    """Sum and non-null count of every monthly column per rollup key; ``data`` has the users' ``age_group``."""
+    lat_cell, lon_cell = geo_cells(data['latitude'], data['longitude'])
+    values = {c: data[c].astype('float64') for c in MONTHLY_COLUMNS}
+    values['totalProductPower'] = values['totalProductPower'].clip(*PRODUCTION_CLIP)
+    values = pd.DataFrame(values)
+
+    keys = [data['usage_month'].to_numpy(), data['age_group'].to_numpy(), lat_cell, lon_cell]
+    sums = values.groupby(keys).sum().add_suffix('_sum')
+    counts = values.notna().groupby(keys).sum().add_suffix('_count')
+    cube = pd.concat([sums, counts], axis=1)
+    cube.index.names = ROLLUP_KEYS
+    return cube.reset_index()
+
+
+def rollup_means(cube, age_groups=None, cells=None):
+    """Monthly means from the cube, restricted to ``age_groups`` and ``(lat, lon)`` ``cells``."""
+    mask = np.ones(len(cube), dtype=bool)
+    if age_groups:
+        mask &= cube['age_group'].isin([AGE_GROUPS.index(g) for g in age_groups]).to_numpy()
+    if cells is not None:
+        selected = pd.MultiIndex.from_tuples(list(cells))
+        mask &= pd.MultiIndex.from_arrays([cube['lat_cell'], cube['lon_cell']]).isin(selected)
+
+    totals = cube[mask].groupby('usage_month')[[c for c in cube.columns if c.endswith(('_sum', '_count'))]].sum()
+    monthly = pd.DataFrame({c: totals[f'{c}_sum'] / totals[f'{c}_count'] for c in MONTHLY_COLUMNS})
+    monthly.insert(0, 'usage_month', np.asarray(MONTH_NAMES)[monthly.index - 1])
+    return monthly.reset_index(drop=True)
+
+
+@store.locked
+def build_rollup(store_path=None):
+    """Compute the rollup cube from the household store and write it."""
+    store_path = store_path or paths.ROLLUP_STORE
+    columns = ['user_id', 'usage_month', 'latitude', 'longitude', *MONTHLY_COLUMNS]
+    cube = build_rollup_cube(store.join_users(store.load_household(columns), ['age_group']))
+    store.write_parquet(cube, store_path)
+    return cube
+
+
+def ensure_rollup(store_path=None):
+    """(Re)build the rollup cube if the household store changed."""
+    store_path = store_path or paths.ROLLUP_STORE
+    sources = [store.ensure_household_store(), store.ensure_users_store()]
+    store.build_once(lambda: store.is_stale(store_path, sources), lambda: build_rollup(store_path))
+    return store_path
+
+
+def load_rollup(store_path=None):
+    """The rollup cube, built on first use."""
+    return pd.read_parquet(ensure_rollup(store_path))
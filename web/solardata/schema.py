@@ -0,0 +1,90 @@
+"""Compact dtypes and a memory budget for the household daily table.
+
+The table has one row per (user, day), so every byte per row is paid once per
+customer-day. Values are stored as 32-bit numbers and dates as
+``datetime64[ns]``. Once loaded, ``user_id`` becomes a categorical, whose
+16-bit codes are half the size of the stored ids. :func:`check_budget` refuses
+a load whose estimated size would exceed ``MEMORY_BUDGET``. Set
+``SOLARDATA_MEMORY_BUDGET_MB`` to change that budget.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+POWER_COLUMNS = ['totalBuyPower', 'totalProductPower', 'totalUsePower',
+                 'totalOnGridPower', 'night_usage', 'totalSelfUsePower']
+
+# dtypes the household table is stored with
+HOUSEHOLD_DTYPES = {
+    'user_id': 'int32',
+    'usage_date': 'datetime64[ns]',
+    'usage_month': 'int8',
+    **{c: 'float32' for c in POWER_COLUMNS},
+    # float32 keeps coordinates to well under a metre
+    'latitude': 'float32',
+    'longitude': 'float32',
+}
+# dtypes of the users table; ages are missing without a birth date, age groups are -1 then
+USER_DTYPES = {
+    'user_id': 'int32',
+    # seconds reach back to the implausible years of the raw file, e.g. 1006
+    'birth_date': 'datetime64[s]',
+    'age': 'float32',
+    'age_group': 'int8',
+}
+# columns held as categoricals once loaded: a few thousand values repeated on every daily row
+CATEGORICAL_COLUMNS = ['user_id']
+
+# bytes a loaded frame may take, in MB
+MEMORY_BUDGET = float(os.environ.get('SOLARDATA_MEMORY_BUDGET_MB', 2048))
+
+
+class MemoryBudgetError(MemoryError):
+    """Raised instead of loading data that would not fit in the memory budget."""
+
+
+def compact(data, dtypes=None, categorical=()):
+    """Cast ``data`` to the compact dtypes; other numeric columns are downcast and text becomes categorical."""
+    dtypes = HOUSEHOLD_DTYPES if dtypes is None else dtypes
+    data = data.astype({c: t for c, t in dtypes.items() if c in data.columns})
+    for c in data.columns:
+        if c in categorical:
+            data[c] = data[c].astype('category')
+        elif c in dtypes:
+            continue
+        elif pd.api.types.is_integer_dtype(data[c]):
+            data[c] = pd.to_numeric(data[c], downcast='integer')
+        elif pd.api.types.is_float_dtype(data[c]):
+            data[c] = data[c].astype('float32')
+        elif pd.api.types.is_object_dtype(data[c]) or pd.api.types.is_string_dtype(data[c]):
+            # leftovers of the notebook merges, e.g. addresses repeated on every day of a user
+            data[c] = data[c].astype('category')
+    return data
+
+
+def estimate_bytes(rows, columns, dtypes=None):
+    """Bytes ``rows`` rows of ``columns`` take in memory once compacted, not counting categories."""
+    dtypes = HOUSEHOLD_DTYPES if dtypes is None else dtypes
+    # categorical codes of up to 32767 values take two bytes
+    return rows * sum(2 if c in CATEGORICAL_COLUMNS else np.dtype(dtypes.get(c, 'float64')).itemsize
+                      for c in columns)
+
+
+def check_budget(nbytes, budget_mb=None, what='data'):
+    """Raise :class:`MemoryBudgetError` if ``nbytes`` exceed the budget in MB."""
+    budget_mb = MEMORY_BUDGET if budget_mb is None else budget_mb
+    if budget_mb and nbytes > budget_mb * 2**20:
+        raise MemoryBudgetError(f"{what} would take {nbytes / 2**20:.0f} MB, over the memory budget of "
+                                f"{budget_mb:.0f} MB (SOLARDATA_MEMORY_BUDGET_MB)")
+
+
+def memory_report(data):
+    """Memory held by each column of ``data``, largest first, with a total row."""
+    used = data.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({'dtype': data.dtypes.astype(str), 'bytes': used})
+    report = report.sort_values('bytes', ascending=False)
+    report.loc['total'] = ['', used.sum()]
+    report['MB'] = report['bytes'] / 2**20
+    report['share'] = report['bytes'] / used.sum()
+    return report
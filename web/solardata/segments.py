@@ -0,0 +1,39 @@
+"""Threshold segmentation of a line series.
+
+A series is split into runs of consecutive points above or not above a
+threshold, so a line chart can colour each run on its own. Each run is drawn
+through the first point of the next one, so the coloured pieces stay
+connected. Everything is computed in one vectorized pass over the values:
+no sort and no copy of the input frame.
+"""
+import numpy as np
+import pandas as pd
+
+
+def threshold_runs(values, threshold):
+    """Run-length encoding of ``values > threshold`` as ``(starts, lengths, above)`` arrays."""
+    above = np.asarray(values, dtype='float64') > threshold
+    if len(above) == 0:
+        return np.empty(0, 'int64'), np.empty(0, 'int64'), np.empty(0, bool)
+    starts = np.concatenate([[0], np.flatnonzero(above[1:] != above[:-1]) + 1])
+    lengths = np.diff(np.append(starts, len(above)))
+    return starts, lengths, above[starts]
+
+
+def segment_line(data, x, y, threshold, segment='Segment', flag='Above'):
+    """Points of ``x``/``y`` labelled with their run number and whether the run is above ``threshold``.
+
+    Every run but the last gets one more point, the first point of the next
+    run, so the frame has one row per point plus one per boundary. Runs are
+    numbered from 1. A line mark sorts its points by ``x``, so the rows are
+    left in this order.
+    """
+    xs, ys = data[x].to_numpy(), data[y].to_numpy()
+    starts, lengths, above = threshold_runs(ys, threshold)
+    run = np.repeat(np.arange(1, len(starts) + 1), lengths)
+    # positions of the points: every point, then each run's first point again for the run before it
+    extra = starts[1:]
+    points = np.concatenate([np.arange(len(ys)), extra])
+    runs = np.concatenate([run, run[extra - 1]])
+    return pd.DataFrame({x: xs[points], y: ys[points], segment: runs,
+                         flag: np.concatenate([np.repeat(above, lengths), above[:-1]])})
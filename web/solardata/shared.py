@@ -0,0 +1,85 @@
+"""Read-only frames shared by several dashboard worker processes.
+
+``serve.py`` exports every cached frame of :mod:`datacache` once as an Arrow
+IPC file under ``SHARED_DIR``. Workers started with
+``SOLARDATA_SHARED_DIR`` memory-map those files instead of reading the store,
+so the column buffers live once in the page cache, however many workers map
+them. Put the directory on ``/dev/shm`` to keep it in RAM.
+
+Numeric columns come back as views of the mapping, without a copy. NaN is
+therefore written as a float value rather than an Arrow null, which pandas
+would have to fill in a copy. Categorical codes are still copied.
+"""
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+
+from . import paths
+
+SHARED_DIR = Path(os.environ['SOLARDATA_SHARED_DIR']) if os.environ.get('SOLARDATA_SHARED_DIR') else None
+MANIFEST = 'manifest.json'
+
+
+def _table(frame):
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    arrays = [pa.array(frame[name].to_numpy(), type=field.type, from_pandas=False)
+              if pa.types.is_floating(field.type) else pa.array(frame[name], type=field.type, from_pandas=True)
+              for name, field in zip(frame.columns, schema)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write(frame, path):
+    # written aside and renamed, so a worker never maps a half-written file
+    tmp = path.with_name(path.name + '.tmp')
+    table = _table(frame)
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def export(loaders, directory=None):
+    """Write the full result of every loader in ``loaders`` (name -> loader) to ``directory``."""
+    directory = Path(directory or SHARED_DIR or paths.STORE_DIR / 'shared')
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for name, loader in loaders.items():
+        data = loader(None)
+        parts = data if isinstance(data, dict) else {None: data}
+        manifest[name] = {}
+        for key, frame in parts.items():
+            filename = f'{name}.{key}.arrow' if key else f'{name}.arrow'
+            _write(frame, directory / filename)
+            manifest[name][key or ''] = filename
+    tmp = directory / (MANIFEST + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, directory / MANIFEST)
+    # frames no longer exported; workers that still map one keep their mapping
+    written = {filename for files in manifest.values() for filename in files.values()}
+    for path in directory.glob('*.arrow'):
+        if path.name not in written:
+            path.unlink()
+    return directory
+
+
+def stamp(directory=None):
+    """Version of the exported frames; it changes with every :func:`export`."""
+    manifest = Path(directory or SHARED_DIR) / MANIFEST
+    return manifest.stat().st_mtime_ns
+
+
+def _read(path, columns):
+    table = pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+    if columns:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def load(name, columns=None, directory=None):
+    """Exported frame ``name`` (or its dict of frames) restricted to ``columns``, memory-mapped."""
+    directory = Path(directory or SHARED_DIR)
+    files = json.loads((directory / MANIFEST).read_text())[name]
+    if list(files) == ['']:
+        return _read(directory / files[''], columns)
+    return {key: _read(directory / filename, columns) for key, filename in files.items()}
@@ -0,0 +1,138 @@
+"""Spatial index over the households' coordinates.
+
+:class:`GridIndex` buckets the points into a regular longitude/latitude grid
+and keeps their positions sorted by cell. A query only tests the points in
+the cells its bounding box touches:
+- bounding boxes
+- radii around a point, by great-circle distance
+- polygons, e.g. municipality borders given as ``(longitude, latitude)`` vertices
+
+Every query returns a boolean mask over the indexed rows, so it combines
+with the masks of :mod:`solardata.filters`. Membership of the ``REGIONS``
+is computed once when the index is built.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+# degrees; about 5.5 km north-south and 3 km east-west in Denmark
+CELL_SIZE = 0.05
+
+# city centres as (longitude, latitude)
+PLACES = {
+    'Copenhagen': (12.5683, 55.6761),
+    'Aarhus': (10.2039, 56.1629),
+    'Odense': (10.4024, 55.4038),
+    'Aalborg': (9.9217, 57.0488),
+    'Esbjerg': (8.4519, 55.4765),
+}
+# region -> (place, radius in km); a point in several regions belongs to the first
+REGIONS = {
+    'Copenhagen area': ('Copenhagen', 30),
+    'Aarhus area': ('Aarhus', 20),
+    'Odense area': ('Odense', 15),
+    'Aalborg area': ('Aalborg', 15),
+}
+REST = 'Rest of Denmark'
+
+
+def haversine_km(longitude, latitude, lon0, lat0):
+    """Great-circle distance in km of every point from ``(lon0, lat0)``."""
+    lon, lat = np.radians(longitude), np.radians(latitude)
+    lon0, lat0 = np.radians(lon0), np.radians(lat0)
+    a = np.sin((lat - lat0) / 2) ** 2 + np.cos(lat) * np.cos(lat0) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def in_polygon(longitude, latitude, vertices):
+    """Whether each point lies inside the polygon ``vertices`` (even-odd rule)."""
+    vertices = np.asarray(vertices, dtype='float64')
+    inside = np.zeros(len(longitude), dtype=bool)
+    for (x1, y1), (x2, y2) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        crosses = (y1 > latitude) != (y2 > latitude)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = x1 + (latitude - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (longitude < x)
+    return inside
+
+
+class GridIndex:
+    """Points bucketed by grid cell; rows with missing coordinates are never matched."""
+
+    def __init__(self, longitude, latitude, cell=CELL_SIZE, regions=None):
+        self.longitude = np.asarray(longitude, dtype='float64')
+        self.latitude = np.asarray(latitude, dtype='float64')
+        self.cell = cell
+        valid = np.flatnonzero(~(np.isnan(self.longitude) | np.isnan(self.latitude)))
+        self.west = np.min(self.longitude[valid]) if len(valid) else 0.0
+        self.south = np.min(self.latitude[valid]) if len(valid) else 0.0
+        self.located = np.zeros(len(self.longitude), dtype=bool)
+        self.located[valid] = True
+        columns, rows = self._cells(self.longitude[valid], self.latitude[valid])
+        self.columns = int(columns.max()) + 1 if len(valid) else 1
+        self.rows = int(rows.max()) + 1 if len(valid) else 1
+        keys = rows * self.columns + columns
+        order = np.argsort(keys, kind='stable')
+        # positions of the valid rows sorted by cell, and the cell of each
+        self.positions, self.keys = valid[order], keys[order]
+        self.regions = dict(REGIONS if regions is None else regions)
+        self.region_codes = self._assign(self.regions)
+
+    def __len__(self):
+        return len(self.longitude)
+
+    def _cells(self, longitude, latitude):
+        return (np.floor((longitude - self.west) / self.cell).astype('int64'),
+                np.floor((latitude - self.south) / self.cell).astype('int64'))
+
+    def _candidates(self, west, south, east, north):
+        # positions of the points in every cell the box touches
+        (col0, col1), (row0, row1) = self._cells(np.array([west, east]), np.array([south, north]))
+        col0, col1 = max(col0, 0), min(col1, self.columns - 1)
+        if col0 > col1 or row1 < 0:
+            return np.empty(0, dtype='int64')
+        rows = np.arange(max(row0, 0), min(row1, self.rows - 1) + 1)
+        starts = np.searchsorted(self.keys, rows * self.columns + col0, 'left')
+        stops = np.searchsorted(self.keys, rows * self.columns + col1, 'right')
+        lengths = stops - starts
+        # one arange per grid row, concatenated without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.positions[np.arange(lengths.sum()) + offsets]
+
+    def _mask(self, positions, keep):
+        mask = np.zeros(len(self), dtype=bool)
+        mask[positions[keep]] = True
+        return mask
+
+    def bbox(self, west, south, east, north):
+        """Mask of the points inside the box, edges included."""
+        found = self._candidates(west, south, east, north)
+        lon, lat = self.longitude[found], self.latitude[found]
+        return self._mask(found, (lon >= west) & (lon <= east) & (lat >= south) & (lat <= north))
+
+    def radius(self, longitude, latitude, km):
+        """Mask of the points within ``km`` of ``(longitude, latitude)``."""
+        dlat = np.degrees(km / EARTH_RADIUS_KM)
+        dlon = dlat / max(np.cos(np.radians(latitude + np.copysign(dlat, latitude))), 1e-6)
+        found = self._candidates(longitude - dlon, latitude - dlat, longitude + dlon, latitude + dlat)
+        distance = haversine_km(self.longitude[found], self.latitude[found], longitude, latitude)
+        return self._mask(found, distance <= km)
+
+    def polygon(self, vertices):
+        """Mask of the points inside the polygon of ``(longitude, latitude)`` vertices."""
+        vertices = np.asarray(vertices, dtype='float64')
+        (west, south), (east, north) = vertices.min(axis=0), vertices.max(axis=0)
+        found = self._candidates(west, south, east, north)
+        return self._mask(found, in_polygon(self.longitude[found], self.latitude[found], vertices))
+
+    def _assign(self, regions):
+        codes = np.full(len(self), -1, dtype='int8')
+        for code, (place, km) in reversed(list(enumerate(regions.values()))):
+            codes[self.radius(*PLACES[place], km)] = code
+        return codes
+
+    def in_regions(self, names):
+        """Mask of the points in any of the regions ``names``, which may include ``REST``."""
+        selected = np.zeros(len(self.regions) + 1, dtype=bool)  # last entry is code -1
+        for name in names:
+            selected[list(self.regions).index(name) if name != REST else -1] = True
+        return selected[self.region_codes] & self.located
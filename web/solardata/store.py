@@ -0,0 +1,374 @@
+"""Columnar store for the EasyGreen household table.
+
+``dfMerged.csv`` is parsed and cleaned once by :func:`build_household_store`.
+The result is written as a Parquet dataset partitioned by year, so the
+dashboard only reads the columns a page needs. Rows extracted from the
+database later are merged in with :func:`upsert_household`. From then on the
+store holds days the CSV does not have. A rebuild, e.g. after the CSV changed
+or the stored columns or outlier settings changed, therefore starts from the
+stored days and only adds the CSV's other days.
+
+Ages are not repeated on the daily rows. ``user_id-age.csv`` becomes a users
+table with one row per customer (:func:`build_users_store`), holding the age
+and age group. Daily rows look those up by ``user_id`` with :func:`join_users`
+when a page needs them.
+
+Every table of the store is built under :func:`build_lock` and written
+through a temporary path of its own. Sessions and worker processes that find
+a table out of date at the same time therefore build it only once, and never
+read or clobber half-written files.
+"""
+import contextlib
+import functools
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are only serialized within one process
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from . import filters, instrument, outliers, paths, schema
+from .schema import POWER_COLUMNS
+
+HOUSEHOLD_COLUMNS = ['user_id', 'usage_date', 'usage_month', *POWER_COLUMNS, 'latitude', 'longitude']
+USER_COLUMNS = ['user_id', 'birth_date', 'age', 'age_group']
+
+# ages are completed years on this day, the end of the last year with data
+AGE_REFERENCE_DATE = pd.Timestamp('2024-12-31')
+
+# days with more than 500 kWh in any of these columns are meter glitches
+OUTLIER_COLUMNS = ['totalUsePower', 'totalProductPower', 'totalSelfUsePower', 'totalBuyPower']
+OUTLIER_LIMIT = 500
+
+PARTITION_COLUMN = 'usage_year'
+# in paths.STORE_DIR; locked by the process building a table
+BUILD_LOCK_FILE = '.build.lock'
+
+_build_lock = threading.RLock()
+_build_depth = 0
+_lock_file = None
+# lists the stored columns and dtypes and the outlier settings, so stores written by an older version get rebuilt
+COLUMNS_FILE = '_columns'
+
+
+def _columns_spec():
+    rules = f'outliers {outliers.MODE} {outliers.RULES} {outliers.MIN_SCALE} {outliers.MIN_DAYS}'
+    return '\n'.join([*(f'{c} {schema.HOUSEHOLD_DTYPES[c]}' for c in HOUSEHOLD_COLUMNS), rules])
+
+
+def _users_spec():
+    return f'{AGE_REFERENCE_DATE.date()} {filters.AGE_EDGES.tolist()}'
+
+
+def read_users(path=None, reference=AGE_REFERENCE_DATE):
+    """Read ``user_id-age.csv`` into one row per user with birth date, age and age group.
+
+    ``age`` is the completed years at ``reference``, missing without a valid
+    birth date. ``age_group`` indexes ``filters.AGE_GROUPS`` (-1 outside every
+    group). A user listed twice keeps the first row with an age group.
+    """
+    users = pd.read_csv(path or paths.AGE_CSV, sep=';')
+    users.rename(columns={'Kunde ID': 'user_id', 'Fødselsdato': 'birth_date'}, inplace=True)
+    users = users.dropna(subset=['user_id'])
+    birth = pd.to_datetime(users['birth_date'], errors='coerce', format='%d/%m/%Y')
+    before_birthday = (birth.dt.month > reference.month) | (
+        (birth.dt.month == reference.month) & (birth.dt.day > reference.day))
+    users = users.assign(birth_date=birth, age=reference.year - birth.dt.year - before_birthday)
+    users['age_group'] = filters.age_group_codes(users['age'])
+    users = users.sort_values('age_group', key=lambda g: g < 0, kind='stable').drop_duplicates('user_id')
+    return schema.compact(users[USER_COLUMNS].sort_values('user_id', ignore_index=True), schema.USER_DTYPES)
+
+
+def is_outlier(data):
+    """Rows of ``data`` (e.g. raw CSV rows) that are meter glitches, as a boolean Series."""
+    return ~(data[OUTLIER_COLUMNS] < OUTLIER_LIMIT).all(axis=1)
+
+
+def clean_household(data, stats=None):
+    """Drop outliers from the daily rows and compact the dtypes.
+
+    Days above ``OUTLIER_LIMIT`` are dropped. The days that spike against their
+    household's robust ``stats`` (computed from ``data`` if not given) are
+    dropped, clipped or kept as ``outliers.MODE`` says (see :mod:`solardata.outliers`).
+    """
+    data['usage_date'] = pd.to_datetime(data['usage_date'])
+    data['usage_month'] = data['usage_date'].dt.month.astype('int8')
+
+    # remove outliers
+    with instrument.stage('outlier filter', rows_in=len(data)) as s:
+        keep = ~is_outlier(data)
+        data = data.loc[keep, [c for c in HOUSEHOLD_COLUMNS if c in data.columns]]
+        s.rows_out = len(data)
+
+    with instrument.stage('robust outlier filter', rows_in=len(data)) as s:
+        data = outliers.apply(data, stats)
+        s.rows_out = len(data)
+
+    return schema.compact(data).reset_index(drop=True)
+
+
+@contextlib.contextmanager
+def build_lock():
+    """Serialize builds between the threads and the processes sharing ``paths.STORE_DIR``.
+
+    Re-entrant, so a build can ensure the tables it is computed from.
+    """
+    global _build_depth, _lock_file
+    with _build_lock:
+        if not _build_depth:
+            paths.STORE_DIR.mkdir(parents=True, exist_ok=True)
+            _lock_file = open(paths.STORE_DIR / BUILD_LOCK_FILE, 'a')
+            if fcntl:
+                fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        _build_depth += 1
+        try:
+            yield
+        finally:
+            _build_depth -= 1
+            if not _build_depth:
+                # closing the file releases the lock
+                _lock_file.close()
+                _lock_file = None
+
+
+def locked(func):
+    """Decorator running a build under :func:`build_lock`, also when it is called directly."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with build_lock():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def build_once(outdated, build):
+    """Call ``build`` if ``outdated()``, checked again under :func:`build_lock` so concurrent callers build once."""
+    if outdated():
+        with build_lock():
+            if outdated():
+                build()
+
+
+def write_parquet(data, path, index=False):
+    """Write a DataFrame or Arrow table to ``path`` through a temporary file of its own."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    os.close(fd)
+    try:
+        if isinstance(data, pa.Table):
+            pq.write_table(data, tmp)
+        else:
+            data.to_parquet(tmp, index=index)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _replace_dir(new, path):
+    # the old directory is moved aside first and removed once the new one is in place
+    old = Path(tempfile.mkdtemp(dir=path.parent, prefix=f'.{path.name}.old.'))
+    if path.exists():
+        path.rename(old / path.name)
+    new.rename(path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _extracted():
+    # written by extract.py once rows have been fetched from the database
+    return paths.EXTRACT_STATE.exists()
+
+
+def _read_source(csv_path, store_path):
+    csv_path = csv_path or paths.HOUSEHOLD_CSV
+    stored = None
+    if _extracted() and store_path.exists():
+        with instrument.stage('read stored days') as s:
+            stored = pq.read_table(store_path).to_pandas().drop(columns=[PARTITION_COLUMN], errors='ignore')
+            stored['user_id'] = stored['user_id'].astype('int64')
+            s.rows_out = len(stored)
+    if stored is not None and not csv_path.exists():
+        return stored, False
+    with instrument.stage('read csv') as s:
+        raw = pd.read_csv(csv_path)
+        s.rows_out = len(raw)
+    raw['usage_date'] = pd.to_datetime(raw['usage_date'])
+    if stored is None:
+        return raw, True
+    # the extracted days win over the CSV's copy of the same day
+    keys = pd.MultiIndex.from_arrays([raw['user_id'], raw['usage_date'].astype('datetime64[ns]')])
+    known = pd.MultiIndex.from_arrays([stored['user_id'], stored['usage_date'].astype('datetime64[ns]')])
+    return pd.concat([stored, raw[~keys.isin(known)]], ignore_index=True), True
+
+
+@locked
+def build_household_store(csv_path=None, store_path=None):
+    """Write the cleaned household table as a Parquet dataset partitioned by year.
+
+    Once rows have been extracted from the database, the days already in the
+    store are kept and ``csv_path`` only adds the days the store lacks.
+    """
+    store_path = store_path or paths.HOUSEHOLD_STORE
+    raw, read_csv = _read_source(csv_path, store_path)
+    stats = pd.read_parquet(paths.OUTLIER_STATS) if paths.OUTLIER_STATS.exists() else None
+    if read_csv or stats is None or not all(f'{c}_mad' in stats for c in outliers.RULES):
+        # per household and month; kept for judging rows upserted later. Without the CSV the
+        # stored days are already filtered, and their own spread would narrow on every rebuild
+        with instrument.stage('household stats', rows_in=len(raw)):
+            stats = outliers.household_stats(raw)
+        write_parquet(stats, paths.OUTLIER_STATS, index=True)
+    data = clean_household(raw, stats)
+    data[PARTITION_COLUMN] = data['usage_date'].dt.year.astype('int16')
+
+    # write next to the old store and swap, so running apps never read half a dataset
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = Path(tempfile.mkdtemp(dir=store_path.parent, prefix=f'.{store_path.name}.'))
+    try:
+        pq.write_to_dataset(pa.Table.from_pandas(data, preserve_index=False), tmp_path,
+                            partition_cols=[PARTITION_COLUMN])
+        (tmp_path / COLUMNS_FILE).write_text(_columns_spec())
+        _replace_dir(tmp_path, store_path)
+    except BaseException:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return data.drop(columns=[PARTITION_COLUMN])
+
+
+@locked
+def upsert_household(rows, coordinates, store_path=None):
+    """Insert or replace raw daily rows in the store, keyed by ``user_id`` and ``usage_date``.
+
+    ``rows`` are raw ``power_usage`` records without location; ``coordinates`` gives
+    ``latitude``/``longitude`` per ``user_id``. Only the year partitions the rows
+    fall in are rewritten, and their stored days without a location get one
+    from ``coordinates`` too. A corrected day that is now dropped as an outlier
+    replaces the stored day by nothing.
+    """
+    store_path = store_path or paths.HOUSEHOLD_STORE
+    if not store_path.exists():
+        store_path.mkdir(parents=True)
+        (store_path / COLUMNS_FILE).write_text(_columns_spec())
+    rows = rows.drop(columns=['latitude', 'longitude'], errors='ignore')
+    rows = rows.merge(coordinates[['latitude', 'longitude']], left_on='user_id', right_index=True, how='left')
+    rows['usage_date'] = pd.to_datetime(rows['usage_date'])
+    # new days are judged against the household's stored history where there is one
+    stats = pd.read_parquet(paths.OUTLIER_STATS) if paths.OUTLIER_STATS.exists() else None
+    new = clean_household(rows, stats)
+
+    for year, dates in rows.groupby(rows['usage_date'].dt.year)['usage_date']:
+        partition = store_path / f'{PARTITION_COLUMN}={year}'
+        keys = pd.MultiIndex.from_arrays([rows.loc[dates.index, 'user_id'].astype('int32'), dates.astype('datetime64[ns]')])
+        old = pq.read_table(partition).to_pandas() if partition.exists() else new.iloc[:0]
+        old = old[~pd.MultiIndex.from_arrays([old['user_id'], old['usage_date']]).isin(keys)]
+        located = coordinates.reindex(np.asarray(old['user_id'], dtype='int64'))
+        for c in ('latitude', 'longitude'):
+            old[c] = old[c].where(old[c].notna(), located[c].to_numpy()).astype(old[c].dtype)
+        merged = pd.concat([old, new[new['usage_date'].dt.year == year]], ignore_index=True)
+        merged = merged.sort_values(['usage_date', 'user_id'], ignore_index=True)
+
+        # files starting with an underscore are ignored by readers until they are renamed
+        tmp_path = Path(tempfile.mkdtemp(dir=store_path, prefix=f'_{partition.name}.'))
+        pq.write_table(pa.Table.from_pandas(merged[HOUSEHOLD_COLUMNS], preserve_index=False), tmp_path / 'part-0.parquet')
+        _replace_dir(tmp_path, partition)
+
+    # the cache and the derived tables compare against the store's mtime
+    os.utime(store_path)
+    return new
+
+
+def source_files():
+    """Raw files the household store and the users table are built from."""
+    return [paths.HOUSEHOLD_CSV, paths.AGE_CSV]
+
+
+def is_stale(store_path, sources):
+    """True if the store is missing or older than one of its source files."""
+    if not store_path.exists():
+        return True
+    built = store_path.stat().st_mtime_ns
+    return any(p.exists() and p.stat().st_mtime_ns > built for p in sources)
+
+
+def _household_outdated(store_path):
+    columns_file = store_path / COLUMNS_FILE
+    return (is_stale(store_path, [paths.HOUSEHOLD_CSV]) or not columns_file.exists()
+            or columns_file.read_text() != _columns_spec())
+
+
+def ensure_household_store(store_path=None):
+    """(Re)build the household store if it is missing or out of date."""
+    store_path = store_path or paths.HOUSEHOLD_STORE
+    build_once(lambda: _household_outdated(store_path), lambda: build_household_store(store_path=store_path))
+    return store_path
+
+
+def load_household(columns=None, store_path=None, budget_mb=None):
+    """Load the given columns of the household table with compact dtypes.
+
+    ``user_id`` is returned as a categorical. Raises :class:`schema.MemoryBudgetError`
+    before reading anything if the frame would exceed ``budget_mb`` (by default
+    ``schema.MEMORY_BUDGET``).
+    """
+    store_path = ensure_household_store(store_path)
+    columns = list(columns or HOUSEHOLD_COLUMNS)
+    # the row count comes from the Parquet footers, no data is read for it
+    rows = ds.dataset(store_path, format='parquet', partitioning='hive').count_rows()
+    schema.check_budget(schema.estimate_bytes(rows, columns), budget_mb, what=f"household table ({rows} rows)")
+    with instrument.stage('read household store') as s:
+        table = pq.read_table(store_path, columns=columns)
+        data = schema.compact(table.to_pandas(), categorical=schema.CATEGORICAL_COLUMNS)
+        s.rows_out = len(data)
+    return data
+
+
+@locked
+def build_users_store(age_path=None, store_path=None):
+    """Write the users table, one row per ``user_id``."""
+    store_path = store_path or paths.USERS_STORE
+    users = read_users(age_path)
+    table = pa.Table.from_pandas(users, preserve_index=False)
+    # the reference date and age groups the table was computed with, so changing them rebuilds it
+    table = table.replace_schema_metadata({**table.schema.metadata, b'solardata': _users_spec().encode()})
+    write_parquet(table, store_path)
+    return users
+
+
+def ensure_users_store(store_path=None):
+    """(Re)build the users table if it is missing or out of date."""
+    store_path = store_path or paths.USERS_STORE
+    build_once(lambda: (is_stale(store_path, [paths.AGE_CSV]) or
+                        (pq.read_schema(store_path).metadata or {}).get(b'solardata') != _users_spec().encode()),
+               lambda: build_users_store(store_path=store_path))
+    return store_path
+
+
+def load_users(columns=None, store_path=None):
+    """The users table with compact dtypes."""
+    users = pd.read_parquet(ensure_users_store(store_path), columns=columns)
+    return schema.compact(users, schema.USER_DTYPES)
+
+
+def join_users(data, columns=('age', 'age_group'), users=None):
+    """Copy of ``data`` with the users' ``columns`` looked up by its ``user_id``.
+
+    Users missing from the table get a missing age and age group -1.
+    """
+    users = load_users() if users is None else users
+    with instrument.stage('age merge', rows_in=len(data)) as s:
+        found = users.set_index('user_id')[list(columns)].reindex(np.asarray(data['user_id'], dtype='int64'))
+        if 'age_group' in found:
+            found['age_group'] = found['age_group'].fillna(-1)
+        data = data.copy()
+        for c in columns:
+            data[c] = found[c].to_numpy().astype(schema.USER_DTYPES[c])
+        s.rows_out = len(data)
+    return data
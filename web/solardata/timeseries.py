@@ -0,0 +1,257 @@
+"""Time series of the "Solar Energy Data in Denmark" page.
+
+The hourly Energinet forecast, the weekly Google Trends index and the monthly
+gas prices are parsed and aligned once, and the results are stored next to a
+manifest of source file hashes. The page then only slices the stored series
+by date. ``energinetForecast.csv`` is streamed in chunks that are folded into
+hourly, daily, weekly and monthly sums, and when it has only grown just the
+appended rows are parsed.
+
+Those sums form a pyramid of the production series at every ``LEVELS``
+granularity. A chart picks the finest level that still fits its width with
+:func:`pick_level` and cuts out the dates it shows with :func:`date_slice`,
+so changing the date range never resamples the hourly rows.
+"""
+import csv
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from . import align, instrument, paths, store
+
+PRODUCTION = 'Production (MWh per hour)'
+ACCUMULATED = 'Accumulated Production (MWh per hour)'
+SEARCH_INDEX = 'Index'
+GAS_PRICE = 'Price DKK/GJ'
+
+# pyramid level -> (bin frequency as in resample, hours per bin)
+LEVELS = {
+    'hour': ('h', 1),
+    'day': ('D', 24),
+    'week': ('W', 24 * 7),
+    'month': ('MS', 24 * 365.25 / 12),
+}
+
+MANIFEST = 'manifest.json'
+# rows of energinetForecast.csv parsed at a time
+CHUNKSIZE = 200_000
+
+
+def source_files():
+    """Raw files the time series are built from."""
+    return [paths.ENERGINET_CSV, paths.GOOGLE_TRENDS_CSV, paths.GAS_PRICES_CSV]
+
+
+def read_energinet_chunks(path, chunksize=CHUNKSIZE, offset=0):
+    """Stream the hourly forecast as frames of at most ``chunksize`` rows.
+
+    ``ForecastCurrent`` uses a decimal comma and is parsed straight to floats. With
+    ``offset`` only the rows after that many bytes are read, reusing the header line.
+    """
+    with open(path, 'rb') as f:
+        names = next(csv.reader([f.readline().decode('utf-8-sig')], delimiter=';'))
+        if offset:
+            f.seek(offset)
+        reader = pd.read_csv(f, sep=';', header=None, names=names, usecols=['HourDK', 'ForecastCurrent'],
+                             decimal=',', dtype={'ForecastCurrent': 'float64'}, chunksize=chunksize)
+        for chunk in reader:
+            yield pd.DataFrame({'HourDK': align.parse_dates(chunk['HourDK'], 'hour'), PRODUCTION: chunk['ForecastCurrent']})
+
+
+def read_google_trends(path=None):
+    """Weekly Google Trends search index for solar cells in Denmark."""
+    googleData = pd.read_csv(path or paths.GOOGLE_TRENDS_CSV, header=1)
+    return pd.DataFrame({'Week': align.parse_dates(googleData['Uge'], 'week'),
+                         SEARCH_INDEX: googleData['Solcelle: (Danmark)'].astype(float)})
+
+
+def read_gas_prices(path=None):
+    """Monthly gas prices. Source: https://ens.dk/service/statistik-data-noegletal-og-kort/priser-paa-el-og-gas"""
+    gasPrices = pd.read_csv(path or paths.GAS_PRICES_CSV, sep=',')
+    return pd.DataFrame({'Date': align.parse_dates(gasPrices['month'], 'month'),
+                         GAS_PRICE: gasPrices['price kr/GJ']})
+
+
+def bin_sums(hourly, freq):
+    """Production summed per bin of a ``LEVELS`` frequency, labelled as ``resample`` does.
+
+    Weeks end on Sunday and are labelled with it; months are labelled with their first day.
+    """
+    times = hourly['HourDK']
+    if freq == 'h':
+        bins = times.dt.floor('h')
+    elif freq == 'MS':
+        bins = times.dt.to_period('M').dt.start_time
+    else:
+        bins = times.dt.normalize()
+        if freq == 'W':
+            bins = bins + pd.to_timedelta(6 - bins.dt.dayofweek, unit='D')
+    return hourly[PRODUCTION].groupby(bins.to_numpy()).sum()
+
+
+def merge_sums(*partials):
+    """Combine partial sums of the same bins, e.g. from several chunks."""
+    return pd.concat([p for p in partials if p is not None]).groupby(level=0).sum()
+
+
+def finish_sums(sums, freq, label):
+    """Sorted frame of the sums with empty bins filled with zero, as ``resample`` does."""
+    bins = pd.date_range(sums.index.min(), sums.index.max(), freq=freq)
+    return sums.reindex(bins, fill_value=0).rename_axis(label).reset_index(name=PRODUCTION)
+
+
+def ingest_energinet(path, offset=0, sums=None, chunksize=CHUNKSIZE):
+    """Stream ``path`` in chunks and fold each one into the sums of every level.
+
+    Only one chunk is held in memory at a time. ``sums`` maps levels to earlier
+    sums (indexed by bin) to add the new rows to. Returns a frame per level with
+    the bins in a column named after the level, e.g. ``Week``.
+    """
+    sums = dict(sums or {})
+    with instrument.stage('parse energinet') as s:
+        s.rows_in = 0
+        for hourly in read_energinet_chunks(path, chunksize, offset):
+            for level, (freq, _) in LEVELS.items():
+                sums[level] = merge_sums(sums.get(level), bin_sums(hourly, freq))
+            s.rows_in += len(hourly)
+        levels = {level: finish_sums(sums[level], freq, level.capitalize()) for level, (freq, _) in LEVELS.items()}
+        s.rows_out = sum(map(len, levels.values()))
+    return levels
+
+
+def pick_level(start, end, max_points):
+    """Finest level with at most ``max_points`` bins from ``start`` to the end of day ``end``."""
+    hours = (pd.Timestamp(end) - pd.Timestamp(start)) / pd.Timedelta(hours=1) + 24
+    for level, (_, per_bin) in LEVELS.items():
+        if hours / per_bin <= max_points:
+            return level
+    return level
+
+
+def date_slice(data, start, end, column='Date'):
+    """Rows of ``data`` (sorted by ``column``) from ``start`` to the end of day ``end``, as a view."""
+    dates = data[column].to_numpy()
+    first = dates.searchsorted(np.datetime64(pd.Timestamp(start)), 'left')
+    stop = dates.searchsorted(np.datetime64(pd.Timestamp(end) + pd.Timedelta(days=1)), 'left')
+    return data.iloc[first:stop]
+
+
+def align_series(weekly, googleData, gasPrices):
+    """Trim the weekly production, search index and gas prices to a common start date.
+
+    Returns the weekly production with its running total, and the search index and
+    gas prices interpolated at the weeks and months either of them was sampled
+    at, in a ``Date`` column. Between those dates both are linear, so a line
+    through these points is the same as one through daily values.
+    """
+    # set minimum date to match in both dataframes. Use the maximum of the two minimum dates
+    minDate = max(weekly['Week'].min(), googleData['Week'].min())
+    energinetData = weekly[weekly['Week'] >= minDate].copy()
+    googleData = googleData[googleData['Week'] >= minDate].rename(columns={'Week': 'Date'})
+
+    # accumulate the forecast data
+    energinetData[ACCUMULATED] = energinetData[PRODUCTION].cumsum()
+    energinetData['Date'] = energinetData['Week']
+
+    # every sample date of either series within the search index's span
+    dates = pd.DatetimeIndex(googleData['Date']).union(pd.DatetimeIndex(gasPrices['Date']))
+    dates = dates[(dates >= googleData['Date'].min()) & (dates <= googleData['Date'].max())]
+    trends = align.align(dates, {SEARCH_INDEX: (googleData['Date'], googleData[SEARCH_INDEX]),
+                                 GAS_PRICE: (gasPrices['Date'], gasPrices[GAS_PRICE])})
+    return energinetData.reset_index(drop=True), trends
+
+
+def _sha1(path, size=None):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        remaining = path.stat().st_size if size is None else size
+        while remaining > 0:
+            block = f.read(min(remaining, 2**20))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _file_state(path, previous):
+    stat = path.stat()
+    if previous and previous['mtime_ns'] == stat.st_mtime_ns and previous['size'] == stat.st_size:
+        return previous
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': _sha1(path)}
+
+
+def _outdated(store_dir):
+    # cheap check: a missing table, or a source file whose size or mtime differs from the manifest
+    manifest_path = store_dir / MANIFEST
+    tables = [store_dir / f'{level}_sums.parquet' for level in LEVELS]
+    if not manifest_path.exists() or not all(p.exists() for p in tables):
+        return True
+    manifest = json.loads(manifest_path.read_text())
+    return any(manifest.get(p.name, {}).get('mtime_ns') != p.stat().st_mtime_ns
+               or manifest.get(p.name, {}).get('size') != p.stat().st_size for p in source_files())
+
+
+def update_timeseries(store_dir=None, chunksize=CHUNKSIZE):
+    """Bring the stored series up to date with the source files and return the store dir."""
+    store_dir = store_dir or paths.TIMESERIES_STORE
+    store.build_once(lambda: _outdated(store_dir), lambda: _update(store_dir, chunksize))
+    return store_dir
+
+
+def _update(store_dir, chunksize):
+    store_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = store_dir / MANIFEST
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    state = {p.name: _file_state(p, manifest.get(p.name)) for p in source_files()}
+    changed = {name for name in state if manifest.get(name, {}).get('sha1') != state[name]['sha1']}
+
+    energinet = paths.ENERGINET_CSV
+    # raw chunks written by older versions; the hour sums hold the same series
+    shutil.rmtree(store_dir / 'hourly', ignore_errors=True)
+    sum_paths = {level: store_dir / f'{level}_sums.parquet' for level in LEVELS}
+    if not all(p.exists() for p in sum_paths.values()):
+        # a store from before a level was added
+        changed.add(energinet.name)
+    if energinet.name in changed:
+        previous = manifest.get(energinet.name)
+        appended = (previous is not None and all(p.exists() for p in sum_paths.values())
+                    and state[energinet.name]['size'] > previous['size']
+                    and _sha1(energinet, previous['size']) == previous['sha1'])
+        if appended:
+            # only the rows after the previously ingested bytes are new
+            sums = {level: pd.read_parquet(path).set_index(level.capitalize())[PRODUCTION]
+                    for level, path in sum_paths.items()}
+            levels = ingest_energinet(energinet, previous['size'], sums, chunksize=chunksize)
+        else:
+            levels = ingest_energinet(energinet, chunksize=chunksize)
+        for level, data in levels.items():
+            store.write_parquet(data, sum_paths[level])
+
+    if changed:
+        with instrument.stage('align series'):
+            weekly, trends = align_series(pd.read_parquet(sum_paths['week']), read_google_trends(), read_gas_prices())
+        store.write_parquet(weekly, store_dir / 'weekly.parquet')
+        store.write_parquet(trends, store_dir / 'trends.parquet')
+    if state != manifest:
+        tmp = manifest_path.with_name(MANIFEST + '.tmp')
+        tmp.write_text(json.dumps(state, indent=1))
+        os.replace(tmp, manifest_path)
+
+
+def load_timeseries(store_dir=None):
+    """Weekly production, the daily search index / gas price series of the page and the pyramid.
+
+    Every ``LEVELS`` name maps to that level's production sums with their bins in ``Date``.
+    """
+    store_dir = update_timeseries(store_dir)
+    series = {'weekly': pd.read_parquet(store_dir / 'weekly.parquet'),
+              'trends': pd.read_parquet(store_dir / 'trends.parquet')}
+    for level in LEVELS:
+        series[level] = pd.read_parquet(store_dir / f'{level}_sums.parquet').rename(
+            columns={level.capitalize(): 'Date'})
+    return series
@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# the solardata package lives next to the tests, in web/
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from solardata import paths  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point every data file and the store at an empty ``tmp_path``."""
+    data = tmp_path / 'data'
+    data.mkdir()
+    moved = {paths.STORE_DIR: data / 'store', paths.DATA_DIR: data}
+    for name, value in vars(paths).copy().items():
+        if name.isupper() and isinstance(value, Path):
+            old = next(d for d in [*moved, value] if value.is_relative_to(d))
+            monkeypatch.setattr(paths, name, moved.get(old, old) / value.relative_to(old))
+    return data
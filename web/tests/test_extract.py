@@ -0,0 +1,72 @@
+"""extract_power_usage against a SQLite ``power_usage`` table."""
+import os
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine
+
+from benchmarks import synthetic
+from solardata import extract, paths, store
+
+NEW_USER = 99999
+
+
+def stored_days(columns=('user_id', 'usage_date')):
+    data = store.load_household(list(columns))
+    data['user_id'] = data['user_id'].astype('int64')
+    return data
+
+
+def power_usage(template, days, new_user=False):
+    """Raw rows repeating the ``template`` day's values on each of ``days``."""
+    rows = pd.concat([template.assign(usage_date=day.strftime('%Y-%m-%d')) for day in days], ignore_index=True)
+    if new_user:
+        extra = rows[rows['user_id'] == rows['user_id'].min()].assign(user_id=NEW_USER)
+        rows = pd.concat([rows, extra], ignore_index=True)
+    return rows.drop(columns=['latitude', 'longitude', 'age'])
+
+
+def test_incremental_extract(data_dir):
+    rng = np.random.default_rng(0)
+    csv = synthetic.household_rows(3000, rng)
+    csv.to_csv(paths.HOUSEHOLD_CSV, index=False)
+    synthetic.ages(np.unique(csv['user_id']), rng).to_csv(paths.AGE_CSV, sep=';', index=False)
+    pd.DataFrame({'user_id': [NEW_USER], 'address': ['Ny Vej 1'], 'latitude': [55.7], 'longitude': [12.6]}) \
+        .to_csv(paths.ADDRESS_CSV, index=False)
+    csv_days = len(stored_days())
+
+    last = synthetic.LAST_DAY
+    template = csv[csv['usage_date'] == last.strftime('%Y-%m-%d')]
+    engine = create_engine(f"sqlite:///{data_dir / 'db.sqlite'}")
+
+    # first run: everything in the table
+    first = power_usage(template, pd.date_range(last + pd.Timedelta(days=1), periods=3), new_user=True)
+    first.to_sql('power_usage', engine, index=False)
+    assert extract.extract_power_usage(engine) == len(first)
+    assert extract.read_state()['usage_date'] == (last + pd.Timedelta(days=3)).strftime('%Y-%m-%d')
+    days = stored_days(['user_id', 'usage_date', 'latitude'])
+    assert len(days) > csv_days
+    assert days.loc[days['user_id'] == NEW_USER, 'latitude'].eq(55.7).all()
+
+    # second run: an old correction outside the lookback window is not fetched,
+    # the days since the high-water mark minus the window are fetched again
+    old = power_usage(template, [last - pd.Timedelta(days=30)])
+    later = power_usage(template, pd.date_range(last + pd.Timedelta(days=4), periods=2))
+    pd.concat([old, later]).to_sql('power_usage', engine, index=False, if_exists='append')
+    assert extract.extract_power_usage(engine) == len(first) + len(later)
+    assert extract.read_state()['usage_date'] == (last + pd.Timedelta(days=5)).strftime('%Y-%m-%d')
+    extracted = stored_days()
+    assert not extracted.duplicated().any()
+    assert extracted['usage_date'].max() == last + pd.Timedelta(days=5)
+
+    # a newer CSV rebuilds the store, which keeps the extracted days
+    touched = paths.HOUSEHOLD_STORE.stat().st_mtime_ns + 1000
+    os.utime(paths.HOUSEHOLD_CSV, ns=(touched, touched))
+    rebuilt = stored_days()
+    assert paths.HOUSEHOLD_STORE.stat().st_mtime_ns > touched
+    assert not rebuilt.duplicated().any()
+    # the CSV days are judged again against stats that now include the extracted days
+    fetched = extracted[extracted['usage_date'] > last]
+    assert len(fetched) == len(first) + len(later)
+    assert len(rebuilt.merge(fetched)) == len(fetched)
+    assert not paths.EXTRACT_STATE.with_name(paths.EXTRACT_STATE.name + '.tmp').exists()
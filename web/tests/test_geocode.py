@@ -0,0 +1,86 @@
+"""geocode against a local stub of the LocationIQ search API."""
+import json
+import sqlite3
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from solardata import geocode
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # address -> list of status codes to answer with, the last one repeated
+    answers = {
+        'known street 1': [200],
+        'flaky street 2': [500, 200],
+        'nowhere 3': [404],
+    }
+    calls = Counter()
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        address = query['q'][0]
+        n = self.calls[address]
+        self.calls[address] += 1
+        if query['key'][0] != 'good':
+            status = 401
+        else:
+            codes = self.answers[address]
+            status = codes[min(n, len(codes) - 1)]
+        body = json.dumps([{'lat': '55.5', 'lon': '12.5'}] if status == 200 else {'error': 'no'}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    StubHandler.calls.clear()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/search.php'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run(addresses, url, cache_path, key='good'):
+    return geocode.geocode_batch(pd.Series(addresses), key, base_url=url, rate=1000, workers=2,
+                                 cache_path=cache_path, backoff=0, progress=None)
+
+
+def test_batch_retries_caches_and_resumes(server, tmp_path):
+    cache_path = tmp_path / 'geocode.sqlite'
+    addresses = ['Known Street 1', 'flaky  street 2', 'Nowhere 3', 'known street 1']
+
+    first = run(addresses, server, cache_path)
+    assert first['latitude'].tolist()[:2] == [55.5, 55.5]
+    assert first.loc[3].tolist() == [55.5, 12.5]
+    assert first.loc[2].isna().all()
+    # the duplicate address is requested once, the 500 is retried
+    assert StubHandler.calls == {'known street 1': 1, 'flaky street 2': 2, 'nowhere 3': 1}
+
+    with sqlite3.connect(cache_path) as connection:
+        statuses = dict(connection.execute("SELECT address, status FROM geocode"))
+    assert statuses == {'known street 1': geocode.FOUND, 'flaky street 2': geocode.FOUND,
+                        'nowhere 3': geocode.NOT_FOUND}
+
+    StubHandler.calls.clear()
+    second = run(addresses, server, cache_path)
+    assert not StubHandler.calls
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_rejected_key_is_not_retried(server, tmp_path):
+    with pytest.raises(geocode.GeocodeError):
+        run(['Known Street 1'], server, tmp_path / 'geocode.sqlite', key='bad')
+    assert StubHandler.calls == {'known street 1': 1}
@@ -0,0 +1,39 @@
+"""outliers.apply in each SOLARDATA_OUTLIER_MODE."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from solardata import outliers, store
+
+
+@pytest.fixture
+def days():
+    data = synthetic.household_rows(20000, np.random.default_rng(1))
+    data['usage_date'] = pd.to_datetime(data['usage_date'])
+    return data
+
+
+def test_modes(days):
+    stats = outliers.household_stats(days)
+    spikes = outliers.anomalous(days, stats)
+    assert spikes.any()
+
+    pd.testing.assert_frame_equal(outliers.apply(days, stats, 'drop'), days[~spikes])
+    pd.testing.assert_frame_equal(outliers.apply(days, stats, 'off'), days)
+
+    clipped = outliers.apply(days, stats, 'clip')
+    assert len(clipped) == len(days)
+    pd.testing.assert_frame_equal(clipped[~spikes], days[~spikes])
+    columns = list(outliers.RULES)
+    assert (clipped.loc[spikes, columns] <= days.loc[spikes, columns]).all().all()
+    assert (clipped.loc[spikes, columns] < days.loc[spikes, columns]).any(axis=1).all()
+
+    with pytest.raises(ValueError):
+        outliers.apply(days, stats, 'trim')
+
+
+def test_mode_change_rebuilds_store(monkeypatch):
+    spec = store._columns_spec()
+    monkeypatch.setattr(outliers, 'MODE', 'clip')
+    assert store._columns_spec() != spec
@@ -0,0 +1,37 @@
+"""Pages of the dashboard, one module each.
+
+A page module is only imported when its page is first selected, so plotting
+libraries and data are loaded on demand and the static pages stay light.
+"""
+import importlib
+from pathlib import Path
+
+import streamlit as st
+
+# sidebar label -> module
+PAGES = {
+    "Home": 'home',
+    "Solar Energy Data in Denmark": 'denmark',
+    "EasyGreen Geospatial Data": 'geospatial',
+    "EasyGreen Production Development": 'production',
+    "Summary and Conclusions": 'summary',
+    "Sources": 'sources',
+}
+
+NOTEBOOK = Path(__file__).resolve().parents[2] / 'final' / 'explainer.ipynb'
+
+
+def render(page):
+    """Import the module of ``page`` and draw it."""
+    importlib.import_module(f'{__name__}.{PAGES[page]}').render()
+
+
+@st.cache_data(show_spinner=False)
+def _read_notebook(stamp):
+    return NOTEBOOK.read_bytes()
+
+
+def notebook_bytes():
+    """The explainer notebook, read once per version of the file."""
+    stat = NOTEBOOK.stat()
+    return _read_notebook((stat.st_mtime_ns, stat.st_size))
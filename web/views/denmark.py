@@ -0,0 +1,126 @@
+"""Solar power production in Denmark next to search interest and gas prices."""
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+import datacache
+from solardata import align, charts, instrument, timeseries
+from solardata.segments import segment_line
+
+# weekly production above this is highlighted as a peak, in MWh; other granularities scale it by their bin length
+PEAK_THRESHOLD = 15000
+
+
+def render():
+    # Integrafe html plot
+    st.title("An Introduction to the Danish Solar Power Landscape")
+    st.write('')
+    st.write("Solar energy as a renewable source of power production has become increasingly prominent and relevant in Denmark. Not only efforts to slow down catastrophic climate change, but also recent geopolitical events such as the war in Ukraine leading to a shortage of natural gas in many European countries have moved many Danish households to consider installing solar panels on their rooftops.")
+    st.write('')
+    st.write("Therefore, this section investigates the usage of and demand for solar energy, as well as the influence of rising gas prices.")
+    #st.header("")
+    
+    # weekly Energinet production, its hour to month pyramid and daily Google Trends / gas prices, parsed and aligned once per data version
+    series = datacache.timeseries_data()
+    energinetData = series['weekly']
+    mergedData = series['trends']
+
+    # Filters
+    dateRange = st.sidebar.date_input("Filter data by date range", value=(energinetData['Week'].min(), energinetData['Week'].max()), min_value=energinetData['Week'].min(), max_value=energinetData['Week'].max())
+    granularity = st.sidebar.selectbox("Production granularity", ['auto', *timeseries.LEVELS], format_func=str.capitalize,
+                                       help="Auto shows the finest level that fits the chart for the selected dates")
+    
+    # help: source https://www.energidataservice.dk/tso-electricity/Forecasts_Hour
+    st.subheader("Denmark's Solar Power Surge and Seasonal Trends in Response to Rising Gas Prices")    
+    st.write('This time series graph portrays the solar power production in Denmark from 2020 through April 2024 in MWh per hour. The data exhibits clear seasonality, with production escalating in summer due to more sunlight and receding in winter. Interestingly, before the pronounced production dip at the end of 2023, there\'s an exceptional peak surpassing other summer highs. This peak corresponds to a dramatic hike in gas prices in the winter 2022, reaching 27 kr per m³ in its highest, prompting increased dependency on solar energy. Additionally, the early onset of the 2024 summer production peak suggests an acceleration in solar investments by private households and others, resulting in a more substantial and earlier increase in solar power generation.')
+
+    showPeaks = st.checkbox('Highlight Peaks', value=False, key='showPeaks')
+
+    start, end = pd.Timestamp(energinetData['Week'].min()), pd.Timestamp(energinetData['Week'].max())
+    if len(dateRange) < 2:
+        st.spinner('Please select a date range of at least two different dates.')
+    else:
+        start, end = pd.Timestamp(dateRange[0]), pd.Timestamp(dateRange[1])
+        # only the sampled dates in the range, plus its interpolated edges
+        mergedData = align.window(mergedData, start, end)
+
+    # production at the chosen granularity, cut from the precomputed pyramid
+    level = timeseries.pick_level(start, end, charts.MAX_POINTS) if granularity == 'auto' else granularity
+    energinetData = timeseries.date_slice(series[level], start, end)
+    threshold = PEAK_THRESHOLD * timeseries.LEVELS[level][1] / timeseries.LEVELS['week'][1]
+    yTitle = f'Production (MWh per {level})'
+
+    # thin long series to what the chart width can show
+    energinetData = charts.downsample(energinetData, 'Date', 'Production (MWh per hour)')
+    mergedData = charts.downsample(mergedData, 'Date', ['Index', 'Price DKK/GJ'])
+
+    if showPeaks:
+        # bins above the threshold are drawn as lighter runs of the line
+        with instrument.stage('segment peaks', rows_in=len(energinetData)) as stage:
+            df_final = segment_line(energinetData, 'Date', 'Production (MWh per hour)', threshold)
+            stage.rows_out = len(df_final)
+        lines = alt.Chart(df_final).mark_line().encode(
+            x=alt.X('Date:T'),
+            y=alt.Y('Production (MWh per hour):Q', title=yTitle),  # Quantitative data
+            detail='Segment:N',  # Use segment number as detail to differentiate lines
+            color=alt.condition(
+                alt.datum.Above,
+                alt.value('lightgreen'),  # True color
+                alt.value('green')  # False color
+            )
+        )
+    else:
+        df_final = energinetData
+        lines = alt.Chart(df_final).mark_line(color='green').encode(
+            x=alt.X('Date:T'),
+            y=alt.Y('Production (MWh per hour):Q', title=yTitle)
+        )
+    with instrument.stage('render production chart', rows_in=len(df_final)):
+        st.altair_chart(charts.slim(lines), use_container_width=True)
+    st.caption(f"Figure 2: Total solar power production in Denmark [MWh per {level}]")
+
+
+    # The following plot is does not contain any new information
+
+    # st.subheader("Denmark's Solar Energy Growth: Accelerated Accumulation Amidst Gas Price Surge and Solar Investments")
+    # st.write("The accumulated solar power production curve for Denmark, from 2020 to April 2024, shows a steady climb in megawatt-hours. The rate of accumulation notably spikes in 2023, reflecting a response to a surge in gas prices and an increase in solar investments. Entering 2024, the earlier rise in the curve indicates a stronger and earlier seasonal peak, suggesting an expansion in solar capacity due to new installations by private households and other contributors.")
+
+    # st.altair_chart(alt.Chart(energinetData).mark_line(color='#228B22').encode(
+    #     x='Date',
+    #     y='Accumulated Production (MWh per hour)'
+    # ).properties(
+    #     width='container'
+    # ), use_container_width=True)
+
+
+
+
+
+    # help: source https://trends.google.com/trends/explore?date=today%205-y&geo=DK&q=%2Fm%2F078kl
+    st.subheader("Google Trends: Solar Power Search Interest in Denmark")
+    st.write('This Google Trends graph tracks the search interest for solar power in Denmark from 2020 to April 2024. It shows a variable interest level over the years, with a significant spike in the winter of 2022. This spike correlates with the substantial increase in gas prices during that period, which likely prompted the public to explore solar power as an alternative. Following this heightened interest, solar power production peaked in the summer of 2023, suggesting a direct link between search behavior and actual adoption of solar solutions. The graph indicates that as gas prices escalated, Danish citizens turned to online searches to inform decisions on solar energy investments.')
+    showGasPrice = st.checkbox('Show Gas Prices', value=False, key='showGasPrices')
+    # Create a chart with two y-axes 
+
+    # Base chart
+    base = alt.Chart(mergedData).encode(
+        alt.X('Date:T')
+    )
+
+    # First line chart
+    line1 = base.mark_line(color='blue').encode(
+        alt.Y('Index', axis=alt.Axis(title='Search Index', titleColor='blue'))
+    )
+
+    # Second line chart
+    line2 = base.mark_line(color='red').encode(
+        alt.Y('Price DKK/GJ', axis=alt.Axis(title='Price DKK/GJ', titleColor='red', grid=True))
+    )
+
+    
+    chart = alt.layer(line1, line2).resolve_scale(y='independent')
+
+    with instrument.stage('render trends chart', rows_in=len(mergedData)):
+        st.altair_chart(charts.slim(chart if showGasPrice else line1), use_container_width=True)
+
+    st.caption("Figure 3: Solar power search interest and gas prices in Denmark")
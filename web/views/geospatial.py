@@ -0,0 +1,144 @@
+"""Map of EasyGreen's customers by production and self-use."""
+import pandas as pd
+import pydeck as pdk
+import streamlit as st
+
+import datacache
+from solardata import filters, hexbin, instrument, spatial
+
+
+def render():
+    st.title("EasyGreen Geospatial Data")
+
+    # one row per user with the first usage_date, the mean production, self-use and location, and the age and age group
+    data = datacache.user_summary()
+    # built once per data version; its masks are aligned with the rows of the summary
+    index = datacache.spatial_index()
+
+    # Drop rows with missing latitude or longitude
+    data = data.dropna(subset=['latitude', 'longitude', 'totalProductPower', 'totalSelfUsePower', 'age'])
+
+    #create self-usage ratio
+    # data['self_use_ratio'] = np.where(data['totalProductPower'] == 0, 0, data['totalSelfUsePower'] / data['totalProductPower'])
+    # data['self_use_ratio'] = np.minimum(data['self_use_ratio'], 1)
+
+    # Sort by usage_date
+    data = data.sort_values(by='usage_date')
+
+    ## example return (datetime.date(2024, 1, 31), datetime.date(2024, 3, 28))
+    selected_date_range = st.sidebar.date_input("Filter map by system installation date", value=(data['usage_date'].min(), data['usage_date'].max()), min_value=data['usage_date'].min(), max_value=data['usage_date'].max())
+    selected_date_range = pd.to_datetime(selected_date_range)
+
+    if len(selected_date_range.unique()) < 2:
+        st.spinner('Please select a date range of at least two different dates.')
+        selected_date_range = None
+
+    # ## Age range
+    # age_range = st.sidebar.slider("Filter map by customer age range", 0, 100, (0, 100))
+    # data = data[(data['age'] >= age_range[0]) & (data['age'] <= age_range [1])]
+
+    ## Age groups
+    age_groups=st.sidebar.multiselect("Filter map by age groups", filters.AGE_GROUPS)
+
+    ## Regions and distance
+    regions = st.sidebar.multiselect("Filter map by region", [*index.regions, spatial.REST])
+    place = st.sidebar.selectbox("Filter map by distance from", ['Anywhere', *spatial.PLACES])
+    if place != 'Anywhere':
+        distance = st.sidebar.slider("Maximum distance (km)", 1, 200, 20)
+
+    # combine the sidebar filters into one mask and index the data only once
+    with instrument.stage('filter households', rows_in=len(data)):
+        mask = filters.household_mask(data, date_range=selected_date_range, age_groups=age_groups)
+        if regions or place != 'Anywhere':
+            located = index.in_regions(regions) if regions else index.located
+            if place != 'Anywhere':
+                located = located & index.radius(*spatial.PLACES[place], distance)
+            # the rows of data keep the summary's positions as their index labels
+            mask &= located[data.index.to_numpy()]
+
+    if not mask.any():
+        st.warning('No households match the selected filters.')
+        return
+
+    ## Production range
+    max_range = int(data['totalProductPower'].to_numpy()[mask].max())
+    production_range = st.sidebar.slider("Filter map by daily production range", 0, max_range, (0, max_range))
+    with instrument.stage('filter production', rows_in=len(data)) as stage:
+        mask &= filters.household_mask(data, production_range=production_range)
+        data = data[mask]
+        stage.rows_out = len(data)
+
+    elevation = st.sidebar.radio("Analyze map by", ('Average production per day','Self-used power of production per day'))
+    
+    if elevation == 'Average production per day':
+        elevation_weight = 'totalProductPower'
+    elif elevation == 'Self-used power of production per day':
+        elevation_weight = 'totalSelfUsePower'
+    # elif elevation == 'Age':
+    #     elevation_weight = 'age'
+
+    # bin the households into hexagons here and only send the cells to the browser
+    serverBinning = st.sidebar.toggle('Aggregate map on the server', True, help='Only the hexagon totals are sent to the browser instead of every household')
+    
+    #if elevation == 'Average production per day':
+    st.subheader("Visualization of Solar Power Production and Self-Usage Share by EasyGreen Customers Across Denmark")
+    st.write('')
+    st.write("One way to represent the data provided by EasyGreen is to spatially visualize the solar power production and self-used power of their customers across Denmark. The age group and location of each household are provided and allow for a detailed analysis. Feel free to explore the data by adjusting the slider and drop-down menu on the sidebar.")
+    st.write('The plot displays a 3D hexagonal bin map visualization centered over Denmark, highlighting solar power production data for EasyGreen\'s customers. Each hexagonal column represents the geographic clustering of customers, and the height of the columns is proportional to the average daily solar power production. The highest solar power outputs are indicated by the tallest columns, color-coded in red and orange. The map provides geographic and quantitative insights into solar power distribution among EasyGreen\'s customer base.')
+    # elif elevation == 'Age':
+    #     st.subheader("Visualization of EasyGreen's Customer Age Distribution Across Denmark")
+    #     st.write('The plot displays a heatmap distribution of EasyGreen\'s customers across Denmark, color-coded by age. The most concentrated areas with the oldest customer base are shown in red, with decreasing age groups represented by cooler colors, yellow to white. The densest area of older customers is located in the eastern part of Denmark. The heatmap settings have been configured to restrict zooming capabilities to safeguard privacy, ensuring individual customer data cannot be discerned, allowing only a macro view of the age distribution.')
+
+    if serverBinning:
+        with instrument.stage('bin hexagons', rows_in=len(data)) as stage:
+            cells = hexbin.hex_cells(data, elevation_weight, [0, max_range])
+            stage.rows_out = len(cells)
+        layer = pdk.Layer(
+            "ColumnLayer",
+            data=cells,
+            get_position="[longitude, latitude]",
+            get_elevation="elevation",
+            get_fill_color="color",
+            elevation_scale=3000,
+            radius=hexbin.HEX_RADIUS,
+            disk_resolution=6,
+            pickable=True,
+            extruded=True,
+            coverage=1,
+        )
+    else:
+        layer = pdk.Layer(
+            "HexagonLayer" if elevation_weight != 'age' else "HeatmapLayer",
+            data=data,
+            get_position="[longitude, latitude]",
+            #auto_highlight=True,
+            elevation_scale=3000,
+            pickable=True,
+            get_polygon="-",
+            get_fill_color=[0, 0, 0, 20],
+            stroked=False,
+            elevation_range=[0, max_range],
+            extruded=True,
+            coverage=1,
+            get_elevation_weight = elevation_weight
+        )
+
+    view_state = pdk.ViewState(
+        #longitude=10.38831, latitude=55.79594, zoom=6.2, min_zoom=5, max_zoom=11 if elevation_weight != 'age' else 7, pitch=41 if elevation_weight != 'age' else 0, bearing=20 if elevation_weight != 'age' else 0, height=700
+        longitude=10.38831, latitude=55.79594, zoom=6.2, min_zoom=5, max_zoom=11 if elevation_weight != 'age' else 7, pitch=41 if elevation_weight != 'age' else 0, height=700
+    )
+
+
+    # Combined all of it and render a viewport
+    r = pdk.Deck(
+        map_style="mapbox://styles/mapbox/dark-v9",
+        layers=[layer],
+        initial_view_state=view_state,        
+        tooltip={
+        "html":f"<b>{elevation}:</b> {{elevationValue}}<br>",
+        "style": {"color": "white"}
+        })
+
+    with instrument.stage('render map', rows_in=len(cells) if serverBinning else len(data)):
+        st.pydeck_chart(r)
+    st.caption("Figure 4: Geospatial distribution of EasyGreen's customers based on solar power production / self usage and age")
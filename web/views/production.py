@@ -0,0 +1,100 @@
+"""Accumulated production and usage per month."""
+import altair as alt
+import streamlit as st
+
+import datacache
+from solardata import charts, instrument, metrics
+from solardata.monthly import MONTH_NAMES
+from solardata.rollup import rollup_means
+
+
+def render():
+    ## Production
+
+    st.title("Energy Dynamics: Comparing Production and Usage")
+    st.write("The EasyGreen dataset contains several intriguing features related to solar energy. These include daily solar power production, self-used electricity generated by solar panels, and total electricity consumption in individual households. These measurements help us better understand the interplay between solar energy production and usage within private homes. The following interactive figures provide a more detailed visualization of this relationship.")
+    st.subheader("EasyGreen's Solar Power Production and Utilization")
+    st.write("The bar chart presents the average solar power production per month for EasyGreen's customers, measured in kWh/day. Each bar corresponds to a month, with its total height reflecting the average daily production and the darker green portion indicating the average utilized production. There is a clear seasonal trend, with the highest production occurring in the summer months, peaking in July, and the lowest in December, showcasing the variance in solar power generation and utilization throughout the year.")
+    st.write('')
+    st.write("Especially in the months of March and April, there seems to be a strong potential to use a higher share of the available solar energy. These months tend to remain relatively cold in Denmark, leading to a higher usage of electricity at home. However, in spring it can already be quite sunny, with the opportunity to produce a significant amount of solar energy.")
+    st.write('')
+    # shares over all customers and days, from the per-household sums
+    household = datacache.household_metrics()
+    shares = metrics.ratios(household[metrics.SUM_COLUMNS].sum().to_frame().T).iloc[0]
+    labels = {'self_use_ratio': 'Self-used production', 'self_sufficiency': 'Self-sufficiency',
+              'night_share': 'Night usage share', 'grid_share': 'Bought from the grid'}
+    for column, (name, label) in zip(st.columns(len(labels)), labels.items()):
+        column.metric(label, f"{shares[name]:.0%}")
+    st.write('')
+    showSelfUse = st.sidebar.toggle('Show Utilized Production', True)    
+    showNightUsage = st.sidebar.toggle('Show Night Usage', False, help = 'Night usage is calculated as the usage between 18:00 and 06:00')
+    
+    # Chart data: monthly means re-aggregated from the precomputed (month, age group, geo cell) rollup
+    cube = datacache.monthly_rollup()
+    with instrument.stage('monthly means', rows_in=len(cube)) as stage:
+        monthly = rollup_means(cube)
+        stage.rows_out = len(monthly)
+    month_order = MONTH_NAMES
+
+    # Charts
+    production_chart = alt.Chart(monthly).mark_bar(color = 'green', opacity=0.5).encode(
+        x=alt.X('usage_month:N', title='Month', sort=month_order),  # Specify nominal data with :N
+        y=alt.Y('totalProductPower:Q', title='Production in kWh per day'),  # Specify quantitative data with :Q
+            tooltip=[
+                alt.Tooltip('usage_month:N', title='Month'),
+                alt.Tooltip('totalProductPower:Q', title='Average Production per Day')
+            ]
+    ).properties(
+        height=600
+    )
+
+    selfUse_chart = alt.Chart(monthly).mark_bar(color = 'green').encode(
+            x=alt.X('usage_month:N', sort=month_order),  # Specify nominal data with :N
+            y=alt.Y('totalSelfUsePower:Q'),  # Specify quantitative data with :Q
+            tooltip=[
+                alt.Tooltip('usage_month:N', title='Month'),
+                alt.Tooltip('totalSelfUsePower:Q', title='Average Utilized Production per Day')
+            ]
+        ).properties(
+            height=600
+    )
+
+    use_chart = alt.Chart(monthly).mark_bar(color = 'red', opacity=0.5).encode(
+            x=alt.X('usage_month:N', sort=month_order, title = 'Month'),  # Specify nominal data with :N
+            y=alt.Y('totalUsePower:Q', title= 'Usage in kWh per day'),
+            tooltip=[
+                alt.Tooltip('usage_month:N', title='Month'),
+                alt.Tooltip('totalUsePower:Q', title='Usage in kWh per Day')
+            ]
+        ).properties(
+            height=600
+    )
+
+    nightUsage_chart = alt.Chart(monthly).mark_bar(color = 'red').encode(
+            x=alt.X('usage_month:N', sort=month_order),
+            y=alt.Y('night_usage:Q'),
+            tooltip=[
+                alt.Tooltip('usage_month:N', title='Month'),
+                alt.Tooltip('night_usage:Q', title='Avg. Night Usage per Day')
+            ]
+        ).properties(
+            height=600
+    )
+
+    # Plots
+    with instrument.stage('render production chart', rows_in=len(monthly)):
+        st.altair_chart(charts.slim(production_chart+selfUse_chart if showSelfUse else production_chart), use_container_width=True)
+    st.caption("Figure 5: Average monthly solar power production (and utilized production) in kWh/day")
+
+    st.subheader('Household Electricity Usage')
+    st.write('The following bar chart represents the average daily electricity usage at home and the amount of self-produced and used solar power, measured in kWh, for each month. Usage is highest in January and decreases through to the warmer months, with the lowest consumption in June, and then rises again towards the end of the year, with December showing a significant increase, suggesting seasonal influences on electricity demand among households. During the summer months, the self-produced solar power can cover a large share of the used power.')
+    st.write('')
+    st.write('Unfortunately, the night usage of electricity (between 18:00 and 06:00) is highest during the winter months, when very little sunlight is available to satisfy this demand.')
+    st.write('')
+    with instrument.stage('render usage chart', rows_in=len(monthly)):
+        if showSelfUse:
+            usage = use_chart+nightUsage_chart+selfUse_chart if showNightUsage else use_chart+selfUse_chart
+        else:
+            usage = use_chart+nightUsage_chart if showNightUsage else use_chart
+        st.altair_chart(charts.slim(usage), use_container_width=True)
+    st.caption("Figure 6: Average monthly electricity usage (and night usage) per month in kWh/day")
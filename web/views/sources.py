@@ -0,0 +1,15 @@
+"""Data sources."""
+import streamlit as st
+
+
+def render():
+    st.title("Sources")
+    st.write("The data used in this project was provided by EasyGreen, a Danish company specializing in solar energy solutions. The project utilized solar power production and usage data, as well as geospatial and age data from EasyGreen's customers, to analyze solar energy dynamics in Denmark.")
+    st.write('')
+    st.write("The project also incorporated data from Google Trends as well as the Danish organizations Energidataservice and Energistyrelsen. Please see the following links for more information.")
+    st.write('')
+    st.write("EnergiDataService - Electricity Forecasts: https://www.energidataservice.dk/tso-electricity/Forecasts_Hour. Accessed on 29 April 2024.")
+    st.write('')
+    st.write("Danish Energy Agency - Statistik, Data, Nøgletal og Kort: https://ens.dk/service/statistik-data-noegletal-og-kort. Accessed on 29 April 2024.")
+    st.write('')
+    st.write("Google Trends: https://trends.google.com/trends/explore?date=today%205-y&geo=DK&q=%2Fm%2F078kl. Accessed on 29 April 2024.")
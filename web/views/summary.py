@@ -0,0 +1,11 @@
+"""Summary and conclusions."""
+import streamlit as st
+
+
+def render():
+    st.title("Summary and Conclusions")
+    st.write('In a nutshell, the previous pages describe the solar energy landscape in Denmark. The first section illustrates the effect of increasing energy prices due to the war in Ukraine as well as other geopolitical events. Both the produced power from solar as well as the interest in solar energy have increased during the last years.')
+    st.write('')
+    st.write('Furthermore, the usage of self-produced solar energy was portrayed in detail across various regions and age groups. Extensive analysis is facilitated throughout different age groups, production ranges and installation dates. The most prominent differences become apparent between the Copenhagen area and the rest of Denmark, as well as when comparing lower and higher production ranges.')
+    st.write('')
+    st.write('Lastly, household solar production, power usage and self-usage of produced power are visualized, highlighting seasonal variations as well as opportunities for a higher usage of solar energy. Especially the usage during night hours varies significantly from summer to winter.')